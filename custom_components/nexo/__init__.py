@@ -7,43 +7,175 @@ from typing import Final
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
-from .nexoBridge import NexoBridge
+from .const import (
+    CONF_COMMAND_COALESCE_WINDOW,
+    DATA_CONNECTION_MANAGER,
+    DATA_PLATFORMS,
+    DOMAIN,
+    SIGNAL_RESOURCE_REMOVED,
+    SIGNAL_RESOURCES_ADDED,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .nexo_analog_sensor import NexoAnalogSensor
+from .nexo_binary_sensor import NexoBinarySensor
+from .nexo_blind import NexoBlind
+from .nexo_connection_manager import NexoConnectionManager
+from .nexo_gate import NexoGate
+from .nexo_light import NexoLight
+from .nexo_light_dimmable import NexoDimmableLight
+from .nexo_output import NexoOutput
+from .nexo_partition import NexoPartition
+from .nexo_resource import NexoResource
+from .nexo_temperature import NexoTemperature
+from .nexo_thermostat import NexoThermostat
+from .nexoBridge import NEXO_COMMAND_COALESCE_WINDOW, NexoBridge
+from .services import async_setup_services
 
 _LOGGER: Final = logging.getLogger(__name__)
-PLATFORMS: list[Platform | str] = [
-    Platform.ALARM_CONTROL_PANEL,
-    Platform.BINARY_SENSOR,
-    Platform.CLIMATE,
-    Platform.COVER,
-    Platform.LIGHT,
-    Platform.LOCK,
-    Platform.SENSOR,
-    Platform.SWITCH,
-]
+# The platform creating the entities of each resource class
+RESOURCE_PLATFORMS: Final[dict[type[NexoResource], Platform]] = {
+    NexoPartition: Platform.ALARM_CONTROL_PANEL,
+    NexoBinarySensor: Platform.BINARY_SENSOR,
+    NexoThermostat: Platform.CLIMATE,
+    NexoBlind: Platform.COVER,
+    NexoLight: Platform.LIGHT,
+    NexoDimmableLight: Platform.LIGHT,
+    NexoGate: Platform.LOCK,
+    NexoAnalogSensor: Platform.SENSOR,
+    NexoTemperature: Platform.SENSOR,
+    NexoOutput: Platform.SWITCH,
+}
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Nexo services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up NexoBridge instance and initiate connectivity."""
     try:
         ip = dict(entry.data)[CONF_HOST]
-        nexo = hass.data.setdefault(DOMAIN, {})[entry.entry_id] = NexoBridge(ip)
+        store = _snapshot_store(hass, entry)
+        nexo, reused = await _connection_manager(hass).async_acquire(entry.entry_id, ip)
+        if not reused:
+            if (snapshot := await store.async_load()) is not None:
+                _LOGGER.info("Creating entities from cached resource model")
+                nexo.load_snapshot(snapshot)
+        hass.data.setdefault(DOMAIN, {})[entry.entry_id] = nexo
+        _apply_options(nexo, entry)
+        entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+        nexo.snapshot_listener = lambda: store.async_delay_save(
+            nexo.snapshot, SNAPSHOT_SAVE_DELAY
+        )
+        nexo.resources_listener = lambda added, removed: _async_resources_changed(
+            hass, entry, added, removed
+        )
         _LOGGER.info("Connecting to multimedia card on IP: %s", ip)
 
         await nexo.connect()
-        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        # Platforms of resource types showing up later are loaded on demand
+        platforms = _platforms_for(nexo.get_resource_types())
+        hass.data.setdefault(DATA_PLATFORMS, {})[entry.entry_id] = platforms
+        await hass.config_entries.async_forward_entry_setups(entry, platforms)
+        nexo.mark_startup_phase("platforms_forwarded")
         return True
     except Exception:  # pylint: disable=broad-except
         _LOGGER.exception("Connection Error")
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        hass.data.get(DATA_PLATFORMS, {}).pop(entry.entry_id, None)
+        await _connection_manager(hass).async_close(entry.entry_id)
 
     return False
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+    platforms = hass.data.get(DATA_PLATFORMS, {}).get(entry.entry_id, set())
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, platforms):
         hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DATA_PLATFORMS].pop(entry.entry_id, None)
+        # Keep the session for a while, a reload will pick it up again
+        _connection_manager(hass).release(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached resource model of a deleted config entry."""
+    await _connection_manager(hass).async_close(entry.entry_id)
+    await _snapshot_store(hass, entry).async_remove()
+
+
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running bridge, no reload is needed."""
+    if (nexo := hass.data.get(DOMAIN, {}).get(entry.entry_id)) is not None:
+        _apply_options(nexo, entry)
+
+
+def _apply_options(nexo: NexoBridge, entry: ConfigEntry) -> None:
+    """Configure a bridge from the options of its config entry."""
+    nexo.coalescer.window = entry.options.get(
+        CONF_COMMAND_COALESCE_WINDOW, NEXO_COMMAND_COALESCE_WINDOW
+    )
+
+
+@callback
+def _async_resources_changed(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    added: list[NexoResource],
+    removed: list[NexoResource],
+) -> None:
+    """Tell the platforms which resources appeared on or left the card."""
+    loaded = hass.data.get(DATA_PLATFORMS, {}).get(entry.entry_id)
+    if added and loaded is not None:
+        # A new platform picks up the added resources itself when set up
+        if new_platforms := _platforms_for({type(res) for res in added}) - loaded:
+            _LOGGER.info("Loading platforms %s for new resources", new_platforms)
+            loaded |= new_platforms
+            entry.async_create_task(
+                hass,
+                hass.config_entries.async_forward_entry_setups(entry, new_platforms),
+            )
+    if added:
+        async_dispatcher_send(
+            hass, SIGNAL_RESOURCES_ADDED.format(entry.entry_id), added
+        )
+    for resource in removed:
+        async_dispatcher_send(
+            hass, SIGNAL_RESOURCE_REMOVED.format(entry.entry_id, resource.id)
+        )
+
+
+def _platforms_for(resource_types: set[type[NexoResource]]) -> set[Platform]:
+    """Return the platforms needed for resource classes.
+
+    The sensor platform is always needed, it holds the bridge diagnostics.
+    """
+    return {Platform.SENSOR} | {
+        RESOURCE_PLATFORMS[resource_type]
+        for resource_type in resource_types
+        if resource_type in RESOURCE_PLATFORMS
+    }
+
+
+def _snapshot_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    """Return the storage holding the last initial_data of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+
+
+def _connection_manager(hass: HomeAssistant) -> NexoConnectionManager:
+    """Return the manager shared by every Nexo config entry."""
+    if DATA_CONNECTION_MANAGER not in hass.data:
+        hass.data[DATA_CONNECTION_MANAGER] = NexoConnectionManager(hass)
+    return hass.data[DATA_CONNECTION_MANAGER]
@@ -15,10 +15,8 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
-from .nexo import HANexo
+from .nexo import HANexo, async_setup_nexo_platform
 from .nexo_partition import NexoPartition
-from .nexoBridge import NexoBridge
 
 _LOGGER: Final = logging.getLogger(__name__)
 
@@ -27,10 +25,8 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up."""
-    nexo: NexoBridge = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities(
-        HANexoPartition(partition)
-        for partition in nexo.get_resources_by_type(NexoPartition)
+    async_setup_nexo_platform(
+        hass, entry, async_add_entities, {NexoPartition: HANexoPartition}
     )
 
 
@@ -13,10 +13,8 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
-from .nexo import HANexo
+from .nexo import HANexo, async_setup_nexo_platform
 from .nexo_binary_sensor import NexoBinarySensor
-from .nexoBridge import NexoBridge
 
 _LOGGER: Final = logging.getLogger(__name__)
 
@@ -25,10 +23,8 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up."""
-    nexo: NexoBridge = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities(
-        HANexoBinarySensor(sensor)
-        for sensor in nexo.get_resources_by_type(NexoBinarySensor)
+    async_setup_nexo_platform(
+        hass, entry, async_add_entities, {NexoBinarySensor: HANexoBinarySensor}
     )
 
 
@@ -16,10 +16,8 @@ from homeassistant.const import UnitOfTemperature
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
-from .nexo import HANexo
+from .nexo import HANexo, async_setup_nexo_platform
 from .nexo_thermostat import NexoThermostat
-from .nexoBridge import NexoBridge
 
 _LOGGER: Final = logging.getLogger(__name__)
 
@@ -28,10 +26,8 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up."""
-    nexo: NexoBridge = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities(
-        HANexoClimate(thermostat)
-        for thermostat in nexo.get_resources_by_type(NexoThermostat)
+    async_setup_nexo_platform(
+        hass, entry, async_add_entities, {NexoThermostat: HANexoClimate}
     )
 
 
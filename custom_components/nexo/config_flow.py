@@ -7,11 +7,16 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN
+from .const import (
+    CONF_COMMAND_COALESCE_WINDOW,
+    DOMAIN,
+    MAX_COMMAND_COALESCE_WINDOW,
+)
+from .nexoBridge import NEXO_COMMAND_COALESCE_WINDOW
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -65,6 +70,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -88,6 +101,32 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the options of a nexo entry."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        window = self.config_entry.options.get(
+            CONF_COMMAND_COALESCE_WINDOW, NEXO_COMMAND_COALESCE_WINDOW
+        )
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_COMMAND_COALESCE_WINDOW, default=window): vol.All(
+                        vol.Coerce(float),
+                        vol.Range(min=0, max=MAX_COMMAND_COALESCE_WINDOW),
+                    )
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
@@ -1,2 +1,23 @@
 """Constants for the nexo integration."""
 DOMAIN = "nexo"
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 10
+# Seconds an unloaded bridge stays connected in case its entry is set up again
+BRIDGE_PARK_TIMEOUT = 30
+# Option: seconds set commands of a resource are collapsed to the latest, 0 is off
+CONF_COMMAND_COALESCE_WINDOW = "command_coalesce_window"
+MAX_COMMAND_COALESCE_WINDOW = 5
+DATA_CONNECTION_MANAGER = "nexo_connection_manager"
+# Platforms forwarded per config entry id
+DATA_PLATFORMS = "nexo_platforms"
+# Formatted with the config entry id
+SIGNAL_RESOURCES_ADDED = "nexo_resources_added_{}"
+# Formatted with the config entry id and the resource id
+SIGNAL_RESOURCE_REMOVED = "nexo_resource_removed_{}_{}"
+SERVICE_START_RECORDING = "start_recording"
+SERVICE_STOP_RECORDING = "stop_recording"
+SERVICE_START_PROFILE = "start_profile"
+SERVICE_STOP_PROFILE = "stop_profile"
+# Seconds a profile runs before it is written out on its own
+DEFAULT_PROFILE_DURATION = 60
+MAX_PROFILE_DURATION = 3600
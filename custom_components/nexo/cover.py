@@ -14,10 +14,8 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
-from .nexo import HANexo
+from .nexo import HANexo, async_setup_nexo_platform
 from .nexo_blind import NexoBlind
-from .nexoBridge import NexoBridge
 
 _LOGGER: Final = logging.getLogger(__name__)
 
@@ -26,10 +24,7 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up."""
-    nexo: NexoBridge = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities(
-        HANexoBlind(blind) for blind in nexo.get_resources_by_type(NexoBlind)
-    )
+    async_setup_nexo_platform(hass, entry, async_add_entities, {NexoBlind: HANexoBlind})
 
 
 class HANexoBlind(HANexo, CoverEntity):
@@ -0,0 +1,25 @@
+"""Diagnostics support for Nexo."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .nexoBridge import NexoBridge
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    nexo: NexoBridge = hass.data[DOMAIN][entry.entry_id]
+    return async_redact_data(
+        {"entry": entry.as_dict(), "bridge": nexo.diagnostics()}, TO_REDACT
+    )
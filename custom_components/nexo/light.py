@@ -10,11 +10,9 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
-from .nexo import HANexo
+from .nexo import HANexo, async_setup_nexo_platform
 from .nexo_light import NexoLight
 from .nexo_light_dimmable import NexoDimmableLight
-from .nexoBridge import NexoBridge
 
 _LOGGER: Final = logging.getLogger(__name__)
 BRIGHTNESS_SCALE = (0, 255)
@@ -24,14 +22,11 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up."""
-    nexo: NexoBridge = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities(
-        HANexoLight(light) for light in nexo.get_resources_by_type(NexoLight)
-    )
-
-    async_add_entities(
-        HANexoDimmableLight(light)
-        for light in nexo.get_resources_by_type(NexoDimmableLight)
+    async_setup_nexo_platform(
+        hass,
+        entry,
+        async_add_entities,
+        {NexoLight: HANexoLight, NexoDimmableLight: HANexoDimmableLight},
     )
 
 
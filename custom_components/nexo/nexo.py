@@ -2,14 +2,52 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 import logging
 from typing import Final
 
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, SIGNAL_RESOURCE_REMOVED, SIGNAL_RESOURCES_ADDED
 from .nexo_resource import NexoResource
 
 _LOGGER: Final = logging.getLogger(__name__)
 
 
+def async_setup_nexo_platform(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    entity_factories: dict[type[NexoResource], Callable[[NexoResource], Entity]],
+) -> None:
+    """Add entities for the known resources and for any added at runtime."""
+    nexo = hass.data[DOMAIN][entry.entry_id]
+    for resource_type, entity_factory in entity_factories.items():
+        async_add_entities(
+            entity_factory(resource)
+            for resource in nexo.get_resources_by_type(resource_type)
+        )
+
+    @callback
+    def async_add_resources(resources: list[NexoResource]) -> None:
+        async_add_entities(
+            entity_factories[type(resource)](resource)
+            for resource in resources
+            if type(resource) in entity_factories
+        )
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_RESOURCES_ADDED.format(entry.entry_id), async_add_resources
+        )
+    )
+
+
 class HANexo:
     """Base for Home Assistant Nexo Entity."""
 
@@ -27,12 +65,33 @@ class HANexo:
         """Return the id of this Nexo gate."""
         return str(self._nexo_resource.id)
 
+    @property
+    def available(self) -> bool:
+        """Return False while the state is cached and the card has not sent it."""
+        return self._nexo_resource.available
+
     async def async_added_to_hass(self) -> None:
         """Run when this Entity has been added to HA."""
         # Nexo Light should also register callbacks to HA when their state changes
         self._nexo_resource.register_callback(self.async_write_ha_state)
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_RESOURCE_REMOVED.format(
+                    self.platform.config_entry.entry_id, self._nexo_resource.id
+                ),
+                self.async_resource_removed,
+            )
+        )
 
     async def async_will_remove_from_hass(self) -> None:
         """Entity being removed from hass."""
         # The opposite of async_added_to_hass. Remove any registered call backs here.
         self._nexo_resource.remove_callback(self.async_write_ha_state)
+
+    async def async_resource_removed(self) -> None:
+        """Remove this entity because its resource was removed from the card."""
+        if self.registry_entry is not None:
+            er.async_get(self.hass).async_remove(self.entity_id)
+        else:
+            await self.async_remove(force_remove=True)
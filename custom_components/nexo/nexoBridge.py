@@ -1,25 +1,28 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-import json
+from collections.abc import Callable
+import contextlib
 import logging
+import time
 from typing import Final
 
-import rel
-import websocket
-
-from .nexo_analog_sensor import NexoAnalogSensor
-from .nexo_binary_sensor import NexoBinarySensor
-from .nexo_blind import NexoBlind
-from .nexo_blind_group import NexoBlindGroup
-from .nexo_gate import NexoGate
-from .nexo_group_dimmer import NexoGroupDimmer
-from .nexo_light import NexoLight
-from .nexo_light_dimmable import NexoDimmableLight
-from .nexo_output import NexoOutput
-from .nexo_partition import NexoPartition
+import aiohttp
+
+from .nexo_codec import (
+    OP_DATA_UPDATE,
+    OP_INITIAL_DATA,
+    decode_frame,
+    frame_size,
+    peek_op,
+)
+from .nexo_command_coalescer import NexoCommandCoalescer
+from .nexo_command_tracker import NexoCommandTracker
+from .nexo_frame_recorder import FRAME_INBOUND, NexoFrameRecorder
+from .nexo_metrics import NexoBridgeMetrics
+from .nexo_outbound_queue import NexoOutboundQueue
+from .nexo_profiler import NexoProfiler
 from .nexo_resource import NexoResource
-from .nexo_temperature import NexoTemperature
-from .nexo_thermostat import NexoThermostat
+from .nexo_resource_registry import NexoResourceRegistry
+from .nexo_transport import NexoTransport
 
 NEXO_RESOURCE_TYPE_TEMPERATURE = "temperature"
 NEXO_RESOURCE_TYPE_OUTPUT = "output"
@@ -27,97 +30,291 @@ NEXO_RESOURCE_TYPE_SENSOR = "sensor"
 NEXO_RESOURCE_TYPE_ANALOG_SENSOR = "analogsensor"
 NEXO_RESOURCE_TYPE_LIGHT = "light"
 NEXO_INIT_TIMEOUT = 10
+NEXO_CONNECT_TIMEOUT = 10
 NEXO_RECONNECT_TIMEOUT = 5
+NEXO_BACKOFF_MIN = 1
+NEXO_BACKOFF_MAX = 60
+NEXO_MAX_MISSED_PONGS = 2
+NEXO_OUTBOUND_QUEUE_SIZE = 100
+NEXO_COMMAND_COALESCE_WINDOW = 0.3
+NEXO_COMMAND_TIMEOUT = 5
+# Updates taking longer from receive to state write get logged with their stages
+NEXO_SLOW_UPDATE_THRESHOLD = 1
 
 _LOGGER: Final = logging.getLogger(__name__)
 
 
 class NexoBridge:
-    def __init__(self, local_ip) -> None:
-        self.__executor = ThreadPoolExecutor(max_workers=1)
-        self.ws = None
+    def __init__(
+        self,
+        local_ip,
+        session: aiohttp.ClientSession,
+        command_coalesce_window=NEXO_COMMAND_COALESCE_WINDOW,
+    ) -> None:
+        self.metrics = NexoBridgeMetrics()
+        # Every resource command goes through this queue and its single writer
+        self.outbound = NexoOutboundQueue(NEXO_OUTBOUND_QUEUE_SIZE)
+        self.coalescer = NexoCommandCoalescer(command_coalesce_window)
+        self.ws = NexoTransport(
+            session,
+            f"ws://{local_ip}:8766/",
+            self.outbound,
+            self.metrics,
+            on_open=self.on_open,
+            on_message=self.on_message,
+            on_error=self.on_error,
+            on_close=self.on_close,
+            backoff_min=NEXO_BACKOFF_MIN,
+            backoff_max=NEXO_BACKOFF_MAX,
+            connect_timeout=NEXO_CONNECT_TIMEOUT,
+            ping_interval=NEXO_RECONNECT_TIMEOUT,
+            max_missed_pongs=NEXO_MAX_MISSED_PONGS,
+        )
+        self.registry = NexoResourceRegistry()
         self.resources = {}
+        self._resources_by_class: dict[type, dict[int, NexoResource]] = {}
         self.local_ip = local_ip
         self.raw_data_model = {}
+        self._disconnected_at: float | None = None
+        self._frame_received_at: float | None = None
+        self.snapshot_listener: Callable[[], None] | None = None
+        # Called with the resources added and removed after the initial model
+        self.resources_listener: (
+            Callable[[list[NexoResource], list[NexoResource]], None] | None
+        ) = None
         self.initialized = False
+        self._initialized_event = asyncio.Event()
+        self._startup_started = time.monotonic()
+        self.command_tracker = NexoCommandTracker(NEXO_COMMAND_TIMEOUT, self.metrics)
+        self._message_handlers = {
+            OP_INITIAL_DATA: self.on_message_initial_data,
+            OP_DATA_UPDATE: self.on_message_data_update,
+        }
+        self.recorder: NexoFrameRecorder | None = None
+        self.profiler: NexoProfiler | None = None
         self._loop = asyncio.get_running_loop()
 
-    async def async_watchdog(self):
-        if self.ws.sock is None or self.ws.sock.getstatus() != 101:
-            print("Connection reconect")
-            await self.connect()
-        else:
-            asyncio.get_event_loop().call_later(
-                NEXO_RECONNECT_TIMEOUT,
-                lambda: asyncio.create_task(self.async_watchdog()),
-            )
-
     def on_open(self, web_socket):
         _LOGGER.info("Nexo integration started")
+        self.mark_startup_phase("connect")
+
+    def mark_startup_phase(self, phase):
+        """Record the time from connect() to the first occurrence of a phase."""
+        if phase not in self.metrics.startup_phases:
+            elapsed = time.monotonic() - self._startup_started
+            self.metrics.startup_phases[phase] = elapsed
+            _LOGGER.info("Startup phase %s reached after %.3f s", phase, elapsed)
 
     async def wait_for_initial_resources_load(self, timeout):
-        t = timeout
-        while self.initialized is False and t > 0:
-            await asyncio.sleep(1)
-            t = t - 1
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._initialized_event.wait(), timeout)
 
     async def connect(self):
         _LOGGER.info("Connecting... %s:%s", self.local_ip, 8766)
-        _LOGGER.info("Reconnect Timeout %s", NEXO_RECONNECT_TIMEOUT)
+        _LOGGER.info("Ping interval %s", NEXO_RECONNECT_TIMEOUT)
         _LOGGER.info("Init Timeout %s", NEXO_INIT_TIMEOUT)
-        # websocket.enableTrace(traceable=True)
-        if self.ws is not None:
-            self.ws.close()
-
-        self.ws = websocket.WebSocketApp(
-            f"ws://{self.local_ip}:8766/",
-            on_open=self.on_open,
-            on_message=self.on_message,
-            on_error=self.on_error,
-            on_close=self.on_close,
-        )
-        self.ws.run_forever(
-            dispatcher=rel,
-            reconnect=NEXO_RECONNECT_TIMEOUT,
-            ping_interval=NEXO_RECONNECT_TIMEOUT,
-            ping_payload='{"type":"ping"}',
-        )
-
-        if not rel.is_running():
-            self.__executor.submit(rel.dispatch)
+        self._startup_started = time.monotonic()
+        # The transport reconnects on its own, no watchdog is needed
+        self.ws.start()
 
         await self.wait_for_initial_resources_load(NEXO_INIT_TIMEOUT)
-        await self.async_watchdog()
 
-    def on_message(self, web_socket, message):
-        _LOGGER.debug("Message: %s", message)
-        json_message = json.loads(message)
+    async def async_close(self):
+        """Stop the transport and every timer so nothing outlives the bridge."""
+        self.snapshot_listener = None
+        self.resources_listener = None
+        await self.ws.close()
+        self.coalescer.cancel_all()
+        self.command_tracker.cancel_all()
+        self.outbound.clear("bridge closed")
+        await self.async_stop_recording()
+        self.profiler = self.ws.profiler = None
+        _LOGGER.info("Disconnected from %s", self.local_ip)
+
+    def start_recording(self, path):
+        """Record every frame received from and sent to the card into path."""
+        if self.recorder is not None:
+            return
+        self.recorder = NexoFrameRecorder(path)
+        self.ws.recorder = self.recorder
+        _LOGGER.info("Recording frames of %s to %s", self.local_ip, path)
+
+    async def async_stop_recording(self):
+        """Stop recording and wait until the capture is on disk."""
+        if (recorder := self.recorder) is None:
+            return
+        self.recorder = self.ws.recorder = None
+        await recorder.async_close()
+
+    def start_profiling(self):
+        """Profile message handling, publishing and command sending.
+
+        Returns False if another profiler is active and nothing is profiled.
+        """
+        if self.profiler is not None:
+            return True
+        if not (profiler := NexoProfiler()).available():
+            _LOGGER.error(
+                "Not profiling %s, another profiler is already active", self.local_ip
+            )
+            return False
+        self.profiler = self.ws.profiler = profiler
+        _LOGGER.info("Profiling %s", self.local_ip)
+        return True
+
+    async def async_stop_profiling(self, path):
+        """Stop profiling and write the stats to path, False if not profiling."""
+        if (profiler := self.profiler) is None:
+            return False
+        self.profiler = self.ws.profiler = None
+        await self._loop.run_in_executor(None, profiler.dump, path)
+        _LOGGER.info(
+            "Wrote profile of %s sections to %s, %s sections skipped while another"
+            " profiler was active",
+            profiler.sections,
+            path,
+            profiler.conflicts,
+        )
+        return True
 
-        if json_message["op"] == "initial_data":
-            self.on_message_initial_data(json_message)
+    def on_message(self, web_socket, message):
+        if self.profiler is None:
+            self._handle_message(message)
+            return
+        with self.profiler:
+            self._handle_message(message)
+
+    def _handle_message(self, message):
+        self._frame_received_at = time.monotonic()
+        if self.recorder is not None:
+            self.recorder.record(FRAME_INBOUND, message)
+        self.metrics.messages_received += 1
+        self.metrics.bytes_received += (size := frame_size(message))
+        self.mark_startup_phase("first_frame")
+        # Dispatch before decoding so ping/pong and unknown frames are never parsed
+        op = peek_op(message)
+        handler = self._message_handlers.get(op)
+        if handler is None:
+            self.metrics.frames_skipped += 1
+            return
 
-        if json_message["op"] == "data_update":
-            self.on_message_data_update(json_message)
+        _LOGGER.debug("Message: %s", message)
+        if op == OP_INITIAL_DATA:
+            self.metrics.initial_data_bytes = size
+        parse_started = time.perf_counter()
+        json_message = decode_frame(message)
+        self.metrics.parse_time.observe(time.perf_counter() - parse_started)
+        handler(json_message)
 
     def on_message_initial_data(self, json_message):
-        print(">>>>>>>>>>>>>Initial")
-        print(json_message)
+        _LOGGER.debug(
+            "Initial data with %s resources", len(json_message.get("resources", {}))
+        )
         if len(self.raw_data_model.keys()) == 0 and len(json_message.keys()) > 0:
             self.raw_data_model = json_message
             self.update_resources()
+            # Setup may have timed out on a cold start and set up the platforms
+            # without resources, every resource is new to them
+            self.notify_resources_changed(list(self.resources.values()), [])
         else:
-            self.refresh_resources()
+            self.resync_resources(json_message)
+        self.ws.set_live()
+
+        if self.snapshot_listener is not None:
+            self.snapshot_listener()
+
+    def load_snapshot(self, snapshot):
+        """Build the resource model from a cached snapshot of initial_data."""
+        self.raw_data_model = {
+            "op": "initial_data",
+            "resources": {str(res["id"]): res for res in snapshot["resources"]},
+        }
+        self.update_resources()
+        for resource in self.resources.values():
+            resource.available = False
+        self.mark_startup_phase("snapshot_loaded")
+
+    def snapshot(self):
+        """Return a compact copy of the resource model with current states."""
+        resources = []
+        for res in self.raw_data_model.get("resources", {}).values():
+            resource = self.get_resource_by_id(res["id"])
+            if resource is not None:
+                res = {**res, "state": resource.state}
+            resources.append(res)
+        return {"resources": resources}
+
+    def resync_resources(self, json_message):
+        """Replace the model with fresh initial_data, publishing only changes.
+
+        Used after a reconnect and when the model was loaded from a snapshot.
+        """
+        started = time.monotonic()
+        self.raw_data_model = json_message
+        self.refresh_resources()
+        live_resources = json_message.get("resources", {})
+        self.sync_resource_ids(live_resources)
+        # Not counted as updates, nor confirming commands: this is a snapshot
+        dirty = self._apply_states(
+            (resource, res["state"])
+            for res in live_resources.values()
+            if "state" in res
+            and (resource := self.get_resource_by_id(res["id"])) is not None
+        )
+        self._schedule_publish(dirty, time.monotonic())
+        changed = len(dirty)
+
+        self.metrics.resyncs += 1
+        self.metrics.last_resync_changed = changed
+        self.metrics.last_resync_duration = time.monotonic() - started
+        if self._disconnected_at is not None:
+            self.metrics.last_outage_duration = started - self._disconnected_at
+            self._disconnected_at = None
+        _LOGGER.info(
+            "Resynchronized %s changed resources in %.3f s",
+            changed,
+            self.metrics.last_resync_duration,
+        )
+
+    def sync_resource_ids(self, live_resources):
+        """Add and remove resources so the model matches a full resource list."""
+        live_ids = {int(res["id"]) for res in live_resources.values()}
+        removed = [
+            self.remove_resource(resource_id)
+            for resource_id in list(self.resources)
+            if resource_id not in live_ids
+        ]
+        added = []
+        for res in live_resources.values():
+            if self.get_resource_by_id(res["id"]) is None:
+                self.add_resource(res)
+                if (resource := self.get_resource_by_id(res["id"])) is not None:
+                    added.append(resource)
+        self.notify_resources_changed(added, removed)
+
+    def notify_resources_changed(self, added, removed):
+        if not added and not removed:
+            return
+        _LOGGER.info(
+            "Resources added: %s, removed: %s",
+            [resource.id for resource in added],
+            [resource.id for resource in removed],
+        )
+        if self.resources_listener is not None:
+            self.resources_listener(added, removed)
 
     def update_resources(self):
         self.initialized = False
         self.resources.clear()
+        self._resources_by_class.clear()
         for resource_id in dict(self.raw_data_model["resources"]):
             self.add_resource(self.raw_data_model["resources"][resource_id])
 
         # self.add_weather_station(self.raw_data_model["weather_station"])
         self.initialized = True
-        print("AFTER INIT")
-        print(self.resources)
+        self._initialized_event.set()
+        self.mark_startup_phase("model_built")
+        _LOGGER.debug("Resource model built: %s", self.resources)
 
     def add_weather_station(self, weather_station):
         if weather_station is not None and len(weather_station.keys()) > 0:
@@ -128,13 +325,120 @@ class NexoBridge:
         for resource in self.resources.values():
             resource.web_socket = self.ws
 
-    def on_message_data_update(self, json_message):
-        if "resources" in json_message:
-            for res in json_message["resources"]:
-                resource = self.get_resource_by_id(json_message["resources"][res]["id"])
-                if resource is not None and "state" in json_message["resources"][res]:
-                    resource.state = json_message["resources"][res]["state"]
-                    resource.publish_update(self._loop)
+    def on_message_data_update(self, json_message) -> int:
+        started = time.monotonic()
+        updates = []
+        for res in json_message.get("resources", {}).values():
+            resource = self.get_resource_by_id(res["id"])
+            if resource is None:
+                if "type" in res:
+                    # A full resource definition for an id we do not know yet
+                    self.add_runtime_resource(res)
+            elif "state" in res:
+                # Only an update from the card confirms a command in flight
+                self.command_tracker.resolve(resource)
+                updates.append((resource, res["state"]))
+        dirty = self._apply_states(updates)
+        applied_at = time.monotonic()
+        self.metrics.updates_received += len(updates)
+        self.metrics.updates_suppressed += len(updates) - len(dirty)
+        self.metrics.apply_time.observe(applied_at - started)
+        self._schedule_publish(dirty, applied_at)
+        return len(dirty)
+
+    def _apply_states(self, updates) -> list[NexoResource]:
+        """Apply (resource, state) pairs, return the resources that changed.
+
+        A resource loaded from the snapshot becomes available with its first
+        state from the card, so it is published even when the state is the same.
+        """
+        dirty = []
+        for resource, state in updates:
+            stale = not resource.available
+            resource.available = True
+            if resource.update_state(state) or stale:
+                dirty.append(resource)
+        return dirty
+
+    def _schedule_publish(self, resources, applied_at):
+        if resources:
+            # One loop callback per frame instead of one per entity callback
+            self._loop.call_soon(
+                self.publish_updates, resources, self._frame_received_at, applied_at
+            )
+
+    def add_runtime_resource(self, nexo_resource):
+        self.add_resource(nexo_resource)
+        if (resource := self.get_resource_by_id(nexo_resource["id"])) is None:
+            return
+        self.raw_data_model.setdefault("resources", {})[
+            str(nexo_resource["id"])
+        ] = nexo_resource
+        self.notify_resources_changed([resource], [])
+        if self.snapshot_listener is not None:
+            self.snapshot_listener()
+
+    def publish_updates(self, resources, received_at=None, applied_at=None):
+        if self.profiler is None:
+            self._publish_updates(resources, received_at, applied_at)
+            return
+        with self.profiler:
+            self._publish_updates(resources, received_at, applied_at)
+
+    def _publish_updates(self, resources, received_at, applied_at):
+        started = time.monotonic()
+        callbacks = 0
+        for resource in resources:
+            callbacks += resource.publish_update()
+        finished = time.monotonic()
+        self.metrics.updates_published += len(resources)
+        self.metrics.frames_dispatched += 1
+        self.metrics.callbacks_dispatched += callbacks
+        self.metrics.wakeups_saved += max(callbacks - 1, 0)
+        # The entity callbacks are async_write_ha_state, so this is the state write
+        self.metrics.write_time.observe(finished - started)
+        if applied_at is not None:
+            self.metrics.queue_delay.observe(started - applied_at)
+        if received_at is None:
+            return
+        self.metrics.publish_latency.observe(latency := finished - received_at)
+        if latency > NEXO_SLOW_UPDATE_THRESHOLD:
+            _LOGGER.warning(
+                "Update of %s resources took %.3f s from receive to state write"
+                " (apply done after %.3f s, publish started after %.3f s)",
+                len(resources),
+                latency,
+                applied_at - received_at if applied_at is not None else 0,
+                started - received_at,
+            )
+
+    def diagnostics(self):
+        """Return the bridge state and metrics as plain data."""
+        return {
+            "host": self.local_ip,
+            "connection_state": self.ws.state,
+            "resources": self.resource_counts(),
+            "outbound": {
+                "depth": self.outbound.depth,
+                "enqueued": self.outbound.enqueued,
+                "sent": self.outbound.sent,
+                "dropped": self.outbound.dropped,
+                "last_latency": self.outbound.last_latency,
+                "average_latency": self.outbound.average_latency,
+                "max_latency": self.outbound.max_latency,
+            },
+            "resource_types": self.registry.as_dict(),
+            "commands_coalesced": self.coalescer.coalesced,
+            "commands_in_flight": self.command_tracker.in_flight,
+            "metrics": self.metrics.as_dict(),
+        }
+
+    def resource_counts(self) -> dict[str, int]:
+        """Return the number of resources of each type."""
+        return {
+            resource_type.__name__: len(resources)
+            for resource_type, resources in self._resources_by_class.items()
+        }
 
     def get_resource_by_id(self, resource_id) -> NexoResource | None:
         if int(resource_id) in self.resources:
@@ -142,85 +446,37 @@ class NexoBridge:
         return None
 
     def get_resources_by_type(self, resource_type):
-        return list(
-            filter(lambda x: type(x) is resource_type, list(self.resources.values()))
-        )
+        return list(self._resources_by_class.get(resource_type, {}).values())
+
+    def get_resource_types(self) -> set[type[NexoResource]]:
+        """Return the resource classes with at least one resource."""
+        return {
+            resource_type
+            for resource_type, resources in self._resources_by_class.items()
+            if resources
+        }
+
+    def _index_resource(self, resource: NexoResource):
+        self.remove_resource(resource.id)
+        resource.coalescer = self.coalescer
+        resource.command_tracker = self.command_tracker
+        self.resources[resource.id] = resource
+        self._resources_by_class.setdefault(type(resource), {})[resource.id] = resource
+
+    def remove_resource(self, resource_id) -> NexoResource | None:
+        resource = self.resources.pop(int(resource_id), None)
+        if resource is not None:
+            self._resources_by_class[type(resource)].pop(resource.id, None)
+        return resource
 
     def on_error(self, web_socket, error):
         _LOGGER.error(error)
 
     def on_close(self, web_socket, close_status_code, close_msg):
         _LOGGER.error("Connection closed")
+        if self._disconnected_at is None:
+            self._disconnected_at = time.monotonic()
 
     def add_resource(self, nexo_resource):
-        nexo_resource_type = nexo_resource["type"]
-        match nexo_resource_type:
-            case "light":
-                if "state" in nexo_resource and "brightness" in nexo_resource["state"]:
-                    # This is a dimmable light
-                    obj = NexoDimmableLight(self.ws, **nexo_resource)
-                    self.resources[obj.id] = obj
-                else:
-                    # This is a simple light
-                    obj = NexoLight(self.ws, **nexo_resource)
-                    self.resources[obj.id] = obj
-
-            case "led":
-                if "state" in nexo_resource and "brightness" in nexo_resource["state"]:
-                    # This is a dimmable LED
-                    obj = NexoDimmableLight(self.ws, **nexo_resource)
-                    self.resources[obj.id] = obj
-                else:
-                    # This is a simple LLED
-                    obj = NexoLight(self.ws, **nexo_resource)
-                    self.resources[obj.id] = obj
-            case "sensor":
-                if "state" not in nexo_resource:
-                    return
-                obj = NexoBinarySensor(self.ws, **nexo_resource)
-                self.resources[obj.id] = obj
-
-            case "analogsensor":
-                obj = NexoAnalogSensor(self.ws, **nexo_resource)
-                self.resources[obj.id] = obj
-
-            case "output":
-                obj = NexoOutput(self.ws, **nexo_resource)
-                self.resources[obj.id] = obj
-
-            case "temperature":
-                match nexo_resource["mode"]:
-                    case 1:
-                        obj = NexoTemperature(self.ws, **nexo_resource)
-                    case 2:
-                        obj = NexoThermostat(self.ws, **nexo_resource)
-                    case _:
-                        return
-                self.resources[obj.id] = obj
-
-            case "blind":
-                obj = NexoBlind(self.ws, **nexo_resource)
-                self.resources[obj.id] = obj
-
-            case "group_blind":
-                obj = NexoBlindGroup(self.ws, **nexo_resource)
-                self.resources[obj.id] = obj
-
-            case "group_dimmer":
-                obj = NexoGroupDimmer(self.ws, **nexo_resource)
-                self.resources[obj.id] = obj
-
-            case "gate":
-                obj = NexoGate(self.ws, **nexo_resource)
-                self.resources[obj.id] = obj
-
-            case "partition":
-                obj = NexoPartition(self.ws, **nexo_resource)
-                self.resources[obj.id] = obj
-
-            case _:
-                _LOGGER.warning(
-                    "Unsupported resource type %s, id %s",
-                    nexo_resource_type,
-                    nexo_resource["id"],
-                )
+        if (resource := self.registry.create(self.ws, nexo_resource)) is not None:
+            self._index_resource(resource)
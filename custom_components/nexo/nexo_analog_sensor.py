@@ -6,7 +6,13 @@ from .nexo_resource import NexoResource
 class NexoAnalogSensor(NexoResource):
     """Nexo analog sensor resource."""
 
+    __slots__ = ("_value",)
+    _STATE_FIELDS = ("_value",)
+
+    def _decode_state(self, state) -> None:
+        self._value = state.get("value")
+
     @property
     def value(self) -> int:
         """Return the current analog sensor value."""
-        return self.state["value"]
+        return self._value
@@ -6,13 +6,19 @@ from .nexo_resource import NexoResource
 class NexoBinarySensor(NexoResource):
     """Nexo binary sensor resource."""
 
-    @property
-    def is_on(self) -> bool | None:
-        """Return True if the binary sensor is on, False if off, None if unknown."""
-        match self.state["value"]:
+    __slots__ = ("_is_on",)
+    _STATE_FIELDS = ("_is_on",)
+
+    def _decode_state(self, state) -> None:
+        match state.get("value"):
             case 101:
-                return False
+                self._is_on = False
             case 102:
-                return True
+                self._is_on = True
             case _:
-                return None
+                self._is_on = None
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the binary sensor is on, False if off, None if unknown."""
+        return self._is_on
@@ -18,6 +18,16 @@ class BlindOperation(Enum):
 class NexoBlind(NexoResource):
     """Nexo blind resource."""
 
+    __slots__ = ("_blind_level", "_blind_op", "_open_percentage")
+    _STATE_FIELDS = ("_blind_level", "_blind_op")
+
+    def _decode_state(self, state) -> None:
+        self._blind_level = state.get("blind_level")
+        self._blind_op = state.get("blind_op")
+        self._open_percentage = (
+            100 - self._blind_level if self._blind_level is not None else None
+        )
+
     async def async_close(self) -> None:
         """Close the blind."""
         await self._async_send_cmd(self._get_cmd(BlindOperation.CLOSE.value))
@@ -33,28 +43,21 @@ class NexoBlind(NexoResource):
     async def async_setLevel(self, level) -> None:
         """Set the blind level."""
         await self._async_send_cmd(
-            self._get_cmd_position(BlindOperation.SET_LEVEL.value, level)
+            self._get_cmd_position(BlindOperation.SET_LEVEL.value, level),
+            coalesce=True,
         )
 
-    def _get_cmd(self, operation) -> str:
-        return f'"blind_op":{operation}'
+    def _get_cmd(self, operation) -> dict[str, int]:
+        return {"blind_op": operation}
 
-    def _get_cmd_position(self, operation, level) -> str:
+    def _get_cmd_position(self, operation, level) -> dict[str, int]:
         level = 100 - level
-        return f'"blind_op":{operation},"blind_level":{level},"blind_slope":255'
-
-    @property
-    def _blind_level(self) -> int:
-        return self.state["blind_level"]
-
-    @property
-    def _blind_op(self) -> int:
-        return self.state["blind_op"]
+        return {"blind_op": operation, "blind_level": level, "blind_slope": 255}
 
     @property
     def openPercentage(self) -> int:
         """Return the open percentage of the blind."""
-        return 100 - self._blind_level
+        return self._open_percentage
 
     @property
     def is_opened(self) -> bool:
@@ -6,6 +6,8 @@ from .nexo_resource import NexoResource
 class NexoBlindGroup(NexoResource):
     """Nexo blind group resource."""
 
+    __slots__ = ("ios",)
+
     def __init__(self, web_socket, ios, *args, **kwargs) -> None:
         """Initialize the Nexo blind group resource."""
         super().__init__(web_socket, *args, **kwargs)
@@ -0,0 +1,96 @@
+"""Nexo protocol codec.
+
+All inbound frames are decoded and all outbound frames are encoded here.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from functools import partial
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
+
+OP_INITIAL_DATA = "initial_data"
+OP_DATA_UPDATE = "data_update"
+REDACTED = "**REDACTED**"
+# Command fields never written to logs or captures
+SECRET_FIELDS = frozenset({"password"})
+
+# Fastest available decoder and encoder, selected once at import time
+if orjson is not None:
+    decode = orjson.loads
+
+    def encode(value: Any) -> str:
+        """Encode a value as compact JSON."""
+        return orjson.dumps(value).decode()
+
+else:
+    decode = json.loads
+    encode = partial(json.dumps, separators=(",", ":"))
+DECODER_NAME = "orjson" if orjson is not None else "json"
+
+_OP_PATTERN = re.compile(r'"op"\s*:\s*"([^"]*)"')
+_ID_PATTERN = re.compile(r'"id"\s*:\s*(-?\d+)')
+
+
+def peek_op(message: str) -> str | None:
+    """Return the op of a frame without decoding it, None for ping/pong etc."""
+    if (match := _OP_PATTERN.search(message)) is None:
+        return None
+    return match.group(1)
+
+
+def peek_resource_id(message: str) -> int | None:
+    """Return the resource id of a command frame without decoding it."""
+    if (match := _ID_PATTERN.search(message)) is None:
+        return None
+    return int(match.group(1))
+
+
+def frame_size(message: str) -> int:
+    """Return the size of a frame in bytes as it was sent on the wire."""
+    # isascii() is a flag check, only frames with e.g. Polish names are encoded
+    return len(message) if message.isascii() else len(message.encode())
+
+
+def decode_frame(message: str) -> dict[str, Any]:
+    """Decode a whole frame."""
+    return decode(message)
+
+
+def redact_frame(message: str) -> str:
+    """Return a frame with the values of secret fields replaced."""
+    if not any(f'"{field}"' in message for field in SECRET_FIELDS):
+        return message
+    return encode(_redact(decode(message)))
+
+
+def _redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in SECRET_FIELDS else _redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+def command_prefix(resource_id) -> str:
+    """Return the constant head of every command frame for a resource."""
+    return f'{{"type":"resource","id":{encode(resource_id)},"cmd":{{'
+
+
+def encode_command(prefix: str, fields: Mapping[str, Any]) -> str:
+    """Encode a resource command from its prefix and command fields."""
+    return (
+        prefix
+        + ",".join(f'"{key}":{encode(value)}' for key, value in fields.items())
+        + "}}"
+    )
@@ -0,0 +1,61 @@
+"""Nexo command coalescer."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+
+
+class NexoCommandCoalescer:
+    """Collapse rapid set commands for a resource to the latest value.
+
+    The first command of a burst is sent right away. Commands arriving within
+    ``window`` seconds replace each other and only the latest one is sent
+    when the window ends.
+    """
+
+    def __init__(self, window: float) -> None:
+        """Initialize the coalescer."""
+        self.window = window
+        self.coalesced = 0
+        self._windows: dict[int, asyncio.TimerHandle] = {}
+        self._pending: dict[int, tuple[str, Callable[[str], None]]] = {}
+
+    def submit(self, resource_id, message: str, send: Callable[[str], None]) -> None:
+        """Send a message now or hold it until the resource window ends."""
+        if self.window <= 0:
+            send(message)
+            return
+        if resource_id in self._windows:
+            if resource_id in self._pending:
+                self.coalesced += 1
+            self._pending[resource_id] = (message, send)
+            return
+        send(message)
+        self._open_window(resource_id)
+
+    def cancel(self, resource_id) -> None:
+        """Forget a held message, e.g. because an on/off/stop was sent."""
+        if (handle := self._windows.pop(resource_id, None)) is not None:
+            handle.cancel()
+        if self._pending.pop(resource_id, None) is not None:
+            self.coalesced += 1
+
+    def cancel_all(self) -> None:
+        """Forget every held message and open window."""
+        for handle in self._windows.values():
+            handle.cancel()
+        self._windows.clear()
+        self._pending.clear()
+
+    def _open_window(self, resource_id) -> None:
+        self._windows[resource_id] = asyncio.get_running_loop().call_later(
+            self.window, self._close_window, resource_id
+        )
+
+    def _close_window(self, resource_id) -> None:
+        del self._windows[resource_id]
+        if (pending := self._pending.pop(resource_id, None)) is not None:
+            message, send = pending
+            send(message)
+            self._open_window(resource_id)
@@ -0,0 +1,76 @@
+"""Nexo in-flight command tracker."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Final
+
+from .nexo_metrics import NexoBridgeMetrics, NexoHistogram
+
+if TYPE_CHECKING:
+    from .nexo_resource import NexoResource
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class NexoCommandTracker:
+    """Apply optimistic states and correlate them with the card's updates.
+
+    A command marks its resource as in flight and immediately shows the
+    expected state in Home Assistant. The next data_update for the resource
+    confirms or corrects it and records the round trip time; if none arrives
+    within ``timeout`` seconds the last confirmed state is restored.
+    """
+
+    def __init__(self, timeout: float, metrics: NexoBridgeMetrics) -> None:
+        """Initialize the tracker."""
+        self._timeout = timeout
+        self._metrics = metrics
+        # Resource id -> (sent at, last confirmed state, timeout handle)
+        self._in_flight: dict[int, tuple[float, dict, asyncio.TimerHandle]] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of resources waiting for confirmation."""
+        return len(self._in_flight)
+
+    def track(self, resource: NexoResource, expected: dict) -> None:
+        """Show the expected state of a resource until the card confirms it."""
+        confirmed_state = resource.state
+        if (pending := self._in_flight.pop(resource.id, None)) is not None:
+            pending[2].cancel()
+            confirmed_state = pending[1]
+        handle = asyncio.get_running_loop().call_later(
+            self._timeout, self._expire, resource
+        )
+        self._in_flight[resource.id] = (time.monotonic(), confirmed_state, handle)
+        if resource.update_state({**resource.state, **expected}):
+            resource.publish_update()
+
+    def resolve(self, resource: NexoResource) -> None:
+        """Record the round trip of a command confirmed by a data_update."""
+        if (pending := self._in_flight.pop(resource.id, None)) is None:
+            return
+        sent_at, _, handle = pending
+        handle.cancel()
+        self._metrics.commands_confirmed += 1
+        self._metrics.command_rtt.setdefault(
+            type(resource).__name__, NexoHistogram()
+        ).observe(time.monotonic() - sent_at)
+
+    def cancel_all(self) -> None:
+        """Stop waiting for every in-flight command."""
+        for _, _, handle in self._in_flight.values():
+            handle.cancel()
+        self._in_flight.clear()
+
+    def _expire(self, resource: NexoResource) -> None:
+        _, confirmed_state, _ = self._in_flight.pop(resource.id)
+        self._metrics.commands_rolled_back += 1
+        _LOGGER.warning(
+            "No update for device id: %s after command, restoring state", resource.id
+        )
+        if resource.update_state(confirmed_state):
+            resource.publish_update()
@@ -0,0 +1,84 @@
+"""Nexo connection manager."""
+
+from __future__ import annotations
+
+import logging
+from typing import Final
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+
+from .const import BRIDGE_PARK_TIMEOUT
+from .nexoBridge import NexoBridge
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class NexoConnectionManager:
+    """Run every Nexo bridge of the integration on the shared event loop.
+
+    All bridges share Home Assistant's HTTP session and loop, so an extra
+    card costs two tasks rather than a thread. Each bridge keeps its own
+    transport, queue and metrics, so one card failing does not affect others.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the manager."""
+        self._hass = hass
+        self._session = async_get_clientsession(hass)
+        self.bridges: dict[str, NexoBridge] = {}
+        # Unloaded bridges kept connected in case their entry is set up again
+        self._parked: dict[str, tuple[NexoBridge, CALLBACK_TYPE]] = {}
+        # Config entries are not unloaded on shutdown, close every bridge then
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_close_all)
+
+    async def async_acquire(self, entry_id: str, host: str) -> tuple[NexoBridge, bool]:
+        """Return the bridge for an entry and whether it was reused."""
+        if (nexo := await self._async_unpark(entry_id, host)) is not None:
+            reused = True
+        else:
+            nexo = NexoBridge(host, self._session)
+            reused = False
+        self.bridges[entry_id] = nexo
+        return nexo, reused
+
+    @callback
+    def release(self, entry_id: str) -> None:
+        """Keep an unloaded bridge connected until it is reused or times out."""
+        if (nexo := self.bridges.pop(entry_id, None)) is None:
+            return
+
+        async def _async_close_parked(_now) -> None:
+            self._parked.pop(entry_id, None)
+            await nexo.async_close()
+
+        self._parked[entry_id] = (
+            nexo,
+            async_call_later(self._hass, BRIDGE_PARK_TIMEOUT, _async_close_parked),
+        )
+
+    async def async_close(self, entry_id: str) -> None:
+        """Close the bridge of an entry, whether active or parked."""
+        if (nexo := self.bridges.pop(entry_id, None)) is not None:
+            await nexo.async_close()
+        if (nexo := await self._async_unpark(entry_id, None)) is not None:
+            await nexo.async_close()
+
+    async def _async_close_all(self, _event: Event) -> None:
+        """Close every active and parked bridge."""
+        for entry_id in {*self.bridges, *self._parked}:
+            await self.async_close(entry_id)
+
+    async def _async_unpark(self, entry_id: str, host: str | None) -> NexoBridge | None:
+        """Return the parked bridge of an entry if it still talks to host."""
+        if (parked := self._parked.pop(entry_id, None)) is None:
+            return None
+        nexo, cancel_close = parked
+        cancel_close()
+        if nexo.local_ip == host:
+            _LOGGER.info("Reusing live connection to multimedia card on IP: %s", host)
+            return nexo
+        await nexo.async_close()
+        return None
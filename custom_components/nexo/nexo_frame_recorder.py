@@ -0,0 +1,106 @@
+"""Nexo frame recorder."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import os
+import time
+from typing import Final
+
+from .nexo_codec import encode, redact_frame
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+FRAME_INBOUND: Final = "in"
+FRAME_OUTBOUND: Final = "out"
+RECORDER_FLUSH_INTERVAL = 1
+RECORDER_MAX_BYTES = 10 * 1024 * 1024
+RECORDER_BACKUP_COUNT = 5
+
+
+class NexoFrameRecorder:
+    """Appends timestamped frames to a rotating gzip compressed JSONL file.
+
+    Every line holds the wall clock time, the direction and the raw frame.
+    Frames are buffered on the event loop and written by an executor job
+    once per flush interval, so recording never blocks the loop. When the
+    file grows past ``max_bytes`` it is rotated like a ``RotatingFileHandler``
+    log, keeping ``backup_count`` older files next to it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = RECORDER_MAX_BYTES,
+        backup_count: int = RECORDER_BACKUP_COUNT,
+        flush_interval: float = RECORDER_FLUSH_INTERVAL,
+    ) -> None:
+        """Initialize the recorder."""
+        self.path = path
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._flush_interval = flush_interval
+        self._buffer: list[str] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._pending: asyncio.Future | None = None
+        self._loop = asyncio.get_running_loop()
+        self.frames = 0
+
+    def record(self, direction: str, frame: str) -> None:
+        """Buffer a frame, it is written with the next flush.
+
+        The alarm code of arm and disarm commands is redacted.
+        """
+        self._buffer.append(
+            encode({"t": time.time(), "dir": direction, "frame": redact_frame(frame)})
+            + "\n"
+        )
+        self.frames += 1
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(
+                self._flush_interval, self._flush
+            )
+
+    async def async_close(self) -> None:
+        """Write the remaining frames and wait for the writes to finish."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._pending is not None:
+            await self._pending
+        if self._buffer:
+            lines, self._buffer = self._buffer, []
+            await self._loop.run_in_executor(None, self._write, lines)
+        _LOGGER.info("Recorded %s frames to %s", self.frames, self.path)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        # Writes must stay in order, wait for the previous one to finish
+        if self._pending is not None and not self._pending.done():
+            self._flush_handle = self._loop.call_later(
+                self._flush_interval, self._flush
+            )
+            return
+        lines, self._buffer = self._buffer, []
+        self._pending = self._loop.run_in_executor(None, self._write, lines)
+
+    def _write(self, lines: list[str]) -> None:
+        try:
+            # Every write adds a gzip member, readers see one continuous stream
+            with gzip.open(self.path, "at", encoding="utf-8") as file:
+                file.writelines(lines)
+            if os.path.getsize(self.path) >= self._max_bytes:
+                self._rotate()
+        except OSError:
+            _LOGGER.exception("Error writing frames to %s", self.path)
+
+    def _rotate(self) -> None:
+        for index in range(self._backup_count - 1, 0, -1):
+            if os.path.exists(source := f"{self.path}.{index}"):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self._backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
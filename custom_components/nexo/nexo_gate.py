@@ -6,16 +6,22 @@ from .nexo_resource import NexoResource
 class NexoGate(NexoResource):
     """Nexo gate."""
 
-    @property
-    def is_open(self) -> bool | None:
-        """Return the state of the gate."""
-        match self.state["value"]:
+    __slots__ = ("_is_open",)
+    _STATE_FIELDS = ("_is_open",)
+
+    def _decode_state(self, state) -> None:
+        match state.get("value"):
             case 1:
-                return True
+                self._is_open = True
             case 2:
-                return False
+                self._is_open = False
             case _:
-                return None
+                self._is_open = None
+
+    @property
+    def is_open(self) -> bool | None:
+        """Return the state of the gate."""
+        return self._is_open
 
     async def async_toggle(self):
         """Toggle the gate."""
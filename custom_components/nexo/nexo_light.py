@@ -5,3 +5,5 @@ from .nexo_resource_switchable import NexoResourceSwitchable
 
 class NexoLight(NexoResourceSwitchable):
     """Nexo light resource."""
+
+    __slots__ = ()
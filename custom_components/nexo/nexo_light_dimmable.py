@@ -5,3 +5,5 @@ from .nexo_resource_dimmable import NexoResourceDimmable
 
 class NexoDimmableLight(NexoResourceDimmable):
     """Nexo dimable light resource."""
+
+    __slots__ = ()
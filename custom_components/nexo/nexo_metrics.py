@@ -0,0 +1,100 @@
+"""Nexo bridge metrics."""
+
+import bisect
+
+# Upper bounds in seconds, the last bucket collects everything slower
+HISTOGRAM_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+class NexoHistogram:
+    """Fixed bucket histogram of durations in seconds."""
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add a duration to the histogram."""
+        self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def average(self) -> float:
+        """Return the average duration."""
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> dict:
+        """Return the histogram as plain data."""
+        return {
+            "count": self.count,
+            "average": self.average,
+            "max": self.max,
+            "buckets": dict(
+                zip([*map(str, HISTOGRAM_BUCKETS), "inf"], self.buckets, strict=True)
+            ),
+        }
+
+
+class NexoBridgeMetrics:
+    """Counters describing the work done by a Nexo bridge."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.messages_received = 0
+        self.bytes_received = 0
+        self.frames_skipped = 0
+        self.message_errors = 0
+        self.frames_dispatched = 0
+        self.callbacks_dispatched = 0
+        self.wakeups_saved = 0
+        self.updates_received = 0
+        self.updates_suppressed = 0
+        self.updates_published = 0
+        # Decoding time of dispatched frames
+        self.parse_time = NexoHistogram()
+        # Stages of a data_update after decoding: applying it to the resources,
+        # waiting in the event loop for the publish callback and writing the
+        # entity states
+        self.apply_time = NexoHistogram()
+        self.queue_delay = NexoHistogram()
+        self.write_time = NexoHistogram()
+        # Time from receiving a frame to its entity callbacks having run
+        self.publish_latency = NexoHistogram()
+        # Size in bytes of the last initial_data frame on the wire
+        self.initial_data_bytes = 0
+        self.commands_confirmed = 0
+        self.commands_rolled_back = 0
+        # Command round trip times per resource class name
+        self.command_rtt: dict[str, NexoHistogram] = {}
+        self.sessions = 0
+        self.reconnects = 0
+        self.connect_failures = 0
+        self.total_downtime = 0.0
+        self.missed_pongs = 0
+        self.last_ping_rtt: float | None = None
+        self.ping_rtt = NexoHistogram()
+        self.resyncs = 0
+        self.last_resync_changed = 0
+        self.last_resync_duration = 0.0
+        self.last_outage_duration = 0.0
+        # Seconds from connect() to each startup phase
+        self.startup_phases: dict[str, float] = {}
+
+    def as_dict(self) -> dict:
+        """Return every metric as plain data."""
+        data = {}
+        for name, value in vars(self).items():
+            if isinstance(value, NexoHistogram):
+                value = value.as_dict()
+            elif isinstance(value, dict):
+                value = {
+                    key: item.as_dict() if isinstance(item, NexoHistogram) else item
+                    for key, item in value.items()
+                }
+            data[name] = value
+        return data
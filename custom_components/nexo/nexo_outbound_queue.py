@@ -0,0 +1,73 @@
+"""Nexo outbound message queue."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Final
+
+from .nexo_codec import peek_resource_id
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class NexoOutboundQueue:
+    """Bounded queue of outbound frames with latency and drop accounting."""
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize the queue."""
+        self._queue: asyncio.Queue[tuple[float, str]] = asyncio.Queue(maxsize)
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of frames waiting for the writer."""
+        return self._queue.qsize()
+
+    @property
+    def average_latency(self) -> float:
+        """Return the average enqueue-to-wire latency in seconds."""
+        return self._total_latency / self.sent if self.sent else 0.0
+
+    def put(self, message: str) -> bool:
+        """Queue a frame without blocking, return False if it was dropped."""
+        try:
+            self._queue.put_nowait((time.monotonic(), message))
+        except asyncio.QueueFull:
+            self.drop(message, "queue full")
+            return False
+        self.enqueued += 1
+        return True
+
+    async def get(self) -> tuple[float, str]:
+        """Wait for the next frame and the time it was queued."""
+        return await self._queue.get()
+
+    def mark_sent(self, enqueued_at: float) -> None:
+        """Record that a frame queued at enqueued_at reached the socket."""
+        latency = time.monotonic() - enqueued_at
+        self.sent += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self._total_latency += latency
+
+    def drop(self, message: str, reason: str) -> None:
+        """Account for a frame that will never be sent."""
+        self.dropped += 1
+        # Only the id, arm and disarm frames carry the alarm code
+        _LOGGER.warning(
+            "Dropping outbound message for resource %s (%s)",
+            peek_resource_id(message),
+            reason,
+        )
+
+    def clear(self, reason: str) -> None:
+        """Drop every queued frame."""
+        while not self._queue.empty():
+            self.drop(self._queue.get_nowait()[1], reason)
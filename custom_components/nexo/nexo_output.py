@@ -5,3 +5,5 @@ from .nexo_resource_switchable import NexoResourceSwitchable
 
 class NexoOutput(NexoResourceSwitchable):
     """Nexo output resource."""
+
+    __slots__ = ()
@@ -6,30 +6,39 @@ from .nexo_resource import NexoResource
 class NexoPartition(NexoResource):
     """Nexo partition resource."""
 
+    __slots__ = ("_is_armed", "_is_suspended", "_is_damaged", "_is_alarming")
+    _STATE_FIELDS = __slots__
+
+    def _decode_state(self, state) -> None:
+        self._is_armed = bool(state.get("is_armed"))
+        self._is_suspended = bool(state.get("is_suspended"))
+        self._is_damaged = bool(state.get("is_damaged"))
+        self._is_alarming = bool(state.get("is_alarming"))
+
     @property
     def is_armed(self) -> bool:
         """Return True if the partition is armed, False if disarmed."""
-        return bool(self.state["is_armed"])
+        return self._is_armed
 
     @property
     def is_suspended(self) -> bool:
         """Return True if the partition is suspended, False otherwise."""
-        return bool(self.state["is_suspended"])
+        return self._is_suspended
 
     @property
     def is_damaged(self) -> bool:
         """Return True if the partition is damaged, False otherwise."""
-        return bool(self.state["is_damaged"])
+        return self._is_damaged
 
     @property
     def is_alarming(self) -> bool:
         """Return True if the partition is alarming, False otherwise."""
-        return bool(self.state["is_alarming"])
+        return self._is_alarming
 
     async def async_arm(self, password) -> None:
         """Arm the partition."""
-        await self._async_send_cmd_operation_custom(1, password=f'"{password}"')
+        await self._async_send_cmd_operation_custom(1, password=password)
 
     async def async_disarm(self, password) -> None:
         """Disarm the partition."""
-        await self._async_send_cmd_operation_custom(0, password=f'"{password}"')
+        await self._async_send_cmd_operation_custom(0, password=password)
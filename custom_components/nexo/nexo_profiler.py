@@ -0,0 +1,59 @@
+"""Nexo hot path profiler."""
+
+from __future__ import annotations
+
+import cProfile
+
+
+class NexoProfiler:
+    """Deterministic profiler enabled only while the hot path runs.
+
+    Used as a context manager around message handling, publishing and
+    command sending, so time spent elsewhere in Home Assistant stays out
+    of the profile. Nested sections keep the profiler enabled until the
+    outermost one ends.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the profiler."""
+        self._profile = cProfile.Profile()
+        self._depth = 0
+        self._enabled = False
+        self.sections = 0
+        # Sections run unprofiled because another profiler was active
+        self.conflicts = 0
+
+    def available(self) -> bool:
+        """Return False if another profiler, e.g. Home Assistant's, is active."""
+        try:
+            self._profile.enable()
+        except ValueError:
+            return False
+        self._profile.disable()
+        return True
+
+    def __enter__(self) -> NexoProfiler:
+        """Enable profiling."""
+        if self._depth == 0:
+            # Since Python 3.12 only one profiler can be active at a time, one
+            # started after us must not break the hot path
+            try:
+                self._profile.enable()
+            except ValueError:
+                self.conflicts += 1
+            else:
+                self._enabled = True
+                self.sections += 1
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Disable profiling when the outermost section ends."""
+        self._depth -= 1
+        if self._depth == 0 and self._enabled:
+            self._profile.disable()
+            self._enabled = False
+
+    def dump(self, path: str) -> None:
+        """Write the collected stats in pstats format, blocking."""
+        self._profile.dump_stats(path)
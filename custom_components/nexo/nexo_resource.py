@@ -1,25 +1,55 @@
 """Nexo resource."""
 
-import asyncio
+from __future__ import annotations
+
 from collections.abc import Callable
 import logging
-from typing import Final
+from typing import TYPE_CHECKING, Any, Final
+
+from .nexo_codec import command_prefix, encode_command
 
-import websocket
+if TYPE_CHECKING:
+    from .nexo_command_coalescer import NexoCommandCoalescer
+    from .nexo_command_tracker import NexoCommandTracker
+    from .nexo_transport import NexoTransport
 
 
 class NexoResource:
-    """Base class for Nexo resources."""
+    """Base class for Nexo resources.
+
+    Subclasses decode the raw state once per update into slots and expose
+    those through properties, so Home Assistant reads never touch the dict.
+    """
+
+    __slots__ = (
+        "web_socket",
+        "_id",
+        "_name",
+        "_cmd_prefix",
+        "state",
+        "coalescer",
+        "command_tracker",
+        "available",
+        "_callbacks",
+    )
 
     _LOGGER: Final = logging.getLogger(__name__)
+    # Decoded attributes exposed to Home Assistant, None compares the raw state
+    _STATE_FIELDS: tuple[str, ...] | None = None
 
     def __init__(self, web_socket, id, name, state, *args, **kwargs) -> None:
         """Initialize the Nexo resource."""
-        self.web_socket: websocket = web_socket
+        self.web_socket: NexoTransport = web_socket
         self._id = id
         self._name = name
+        self._cmd_prefix = command_prefix(id)
         self.state = state
+        self.coalescer: NexoCommandCoalescer | None = None
+        self.command_tracker: NexoCommandTracker | None = None
+        # False while the state is cached and not yet confirmed by the card
+        self.available = True
         self._callbacks = set()
+        self._decode_state(state)
 
     @property
     def id(self) -> str:
@@ -31,33 +61,69 @@ class NexoResource:
         """Return the name of the resource."""
         return self._name
 
-    async def _wrapper(self, awaitable):
-        """Return the result of the awaitable."""
-        if awaitable is not None:
-            return await awaitable()
-        return None
+    async def _async_send(self, message, coalesce=False) -> None:
+        """Queue a message for the websocket writer.
+
+        Coalesced messages (set level, brightness, temperature) may be replaced
+        by a later one, any other message discards a held coalesced one.
+        """
+        if self.coalescer is None:
+            self.web_socket.send(message)
+        elif coalesce:
+            self.coalescer.submit(self.id, message, self._send_now)
+        else:
+            self.coalescer.cancel(self.id)
+            self.web_socket.send(message)
 
-    async def _async_send(self, message) -> None:
-        """Send a message to the websocket."""
+    def _send_now(self, message) -> None:
         self.web_socket.send(message)
 
-    async def _async_send_cmd(self, cmd) -> None:
+    async def _async_send_cmd(self, cmd: dict[str, Any], coalesce=False) -> None:
         """Send a command message to the websocket."""
-        await self._async_send(f'{{"type":"resource","id":{self.id},"cmd":{{{cmd}}}}}')
-
-    async def _async_send_cmd_operation_custom(self, operation, **kwargs) -> None:
+        if (profiler := self.web_socket.profiler) is None:
+            await self._async_send(encode_command(self._cmd_prefix, cmd), coalesce)
+            return
+        # _async_send never suspends, so only this command ends up in the profile
+        with profiler:
+            await self._async_send(encode_command(self._cmd_prefix, cmd), coalesce)
+
+    async def _async_send_cmd_operation_custom(
+        self, operation, *, coalesce=False, **kwargs
+    ) -> None:
         """Send a custom operation command message to the websocket."""
-        cmd = f'"operation":{operation}'
-        if kwargs:
-            cmd += f",{','.join(f'"{key}":{value}' for key, value in kwargs.items())}"
-        await self._async_send_cmd(cmd)
+        await self._async_send_cmd({"operation": operation, **kwargs}, coalesce)
 
-    async def _async_send_cmd_operation(self, operation, value=None) -> None:
+    async def _async_send_cmd_operation(
+        self, operation, value=None, coalesce=False
+    ) -> None:
         """Send an operation command message to the websocket."""
         if value is None:
-            await self._async_send_cmd_operation_custom(operation)
+            await self._async_send_cmd_operation_custom(operation, coalesce=coalesce)
         else:
-            await self._async_send_cmd_operation_custom(operation, value=value)
+            await self._async_send_cmd_operation_custom(
+                operation, coalesce=coalesce, value=value
+            )
+
+    def _apply_optimistic_state(self, **fields) -> None:
+        """Show the state a command is expected to produce until confirmed."""
+        if self.command_tracker is not None:
+            self.command_tracker.track(self, fields)
+
+    def _decode_state(self, state) -> None:
+        """Decode the raw state into the attributes Home Assistant reads."""
+
+    def update_state(self, state) -> bool:
+        """Replace the state, return True if a field exposed to HA changed."""
+        previous = self._exposed_state()
+        self.state = state
+        self._decode_state(state)
+        return self._exposed_state() != previous
+
+    def _exposed_state(self):
+        """Return the decoded attributes Home Assistant entities read."""
+        if self._STATE_FIELDS is None:
+            return self.state
+        return tuple(getattr(self, field) for field in self._STATE_FIELDS)
 
     def register_callback(self, callback: Callable[[], None]) -> None:
         """Register a callback to be called when the resource state changes."""
@@ -67,13 +133,22 @@ class NexoResource:
         """Remove a callback."""
         self._callbacks.discard(callback)
 
-    def publish_update(self, _loop) -> None:
-        """Notify Home Assistant about a state change."""
+    def publish_update(self) -> int:
+        """Notify Home Assistant about a state change.
+
+        Must be called from the event loop. Returns the number of callbacks run.
+        """
+        self._LOGGER.debug(
+            "Notifying HA about state change of device id: %s type: %s to state %s",
+            self.id,
+            self.name,
+            self.state,
+        )
         for callback in self._callbacks:
-            self._LOGGER.debug(
-                "Notifying HA about state change of device id: %s type: %s to state %s",
-                self.id,
-                self.name,
-                self.state,
-            )
-            asyncio.run_coroutine_threadsafe(self._wrapper(callback), _loop)
+            try:
+                callback()
+            except Exception:  # pylint: disable=broad-except
+                self._LOGGER.exception(
+                    "Error notifying HA about device id: %s", self.id
+                )
+        return len(self._callbacks)
@@ -6,11 +6,22 @@ from .nexo_resource_switchable import NexoResourceSwitchable
 class NexoResourceDimmable(NexoResourceSwitchable):
     """Base class for Nexo switchable resources."""
 
+    __slots__ = ("_brightness",)
+    _STATE_FIELDS = ("_is_on", "_brightness")
+
+    def _decode_state(self, state) -> None:
+        super()._decode_state(state)
+        brightness = state.get("brightness")
+        self._brightness = int(brightness) if brightness is not None else 0
+
     @property
     def brightness(self) -> int:
         """Return brightnes level of the resource."""
-        return int(self.state["brightness"])
+        return self._brightness
 
     async def async_turn_brightness_on(self, brightness) -> None:
         """Turn on."""
-        await self._async_send_cmd_operation_custom(1, brightness=f"{brightness}")
+        await self._async_send_cmd_operation_custom(
+            1, coalesce=True, brightness=int(brightness)
+        )
+        self._apply_optimistic_state(is_on=1, brightness=brightness)
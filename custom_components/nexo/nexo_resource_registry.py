@@ -0,0 +1,115 @@
+"""Nexo resource registry."""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable, Mapping
+import logging
+from typing import Any, Final
+
+from .nexo_analog_sensor import NexoAnalogSensor
+from .nexo_binary_sensor import NexoBinarySensor
+from .nexo_blind import NexoBlind
+from .nexo_blind_group import NexoBlindGroup
+from .nexo_gate import NexoGate
+from .nexo_group_dimmer import NexoGroupDimmer
+from .nexo_light import NexoLight
+from .nexo_light_dimmable import NexoDimmableLight
+from .nexo_output import NexoOutput
+from .nexo_partition import NexoPartition
+from .nexo_resource import NexoResource
+from .nexo_temperature import NexoTemperature
+from .nexo_thermostat import NexoThermostat
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# Picks the class for a resource definition, None if it cannot be represented
+NexoResourceFactory = Callable[[Mapping[str, Any]], type[NexoResource] | None]
+
+
+def _always(resource_class: type[NexoResource]) -> NexoResourceFactory:
+    return lambda definition: resource_class
+
+
+def _light(definition: Mapping[str, Any]) -> type[NexoResource]:
+    # Lights and LEDs reporting a brightness are dimmable
+    if "brightness" in definition.get("state", ()):
+        return NexoDimmableLight
+    return NexoLight
+
+
+def _sensor(definition: Mapping[str, Any]) -> type[NexoResource] | None:
+    return NexoBinarySensor if "state" in definition else None
+
+
+_TEMPERATURE_MODES: Final = {1: NexoTemperature, 2: NexoThermostat}
+
+
+def _temperature(definition: Mapping[str, Any]) -> type[NexoResource] | None:
+    return _TEMPERATURE_MODES.get(definition.get("mode"))
+
+
+RESOURCE_FACTORIES: Final[dict[str, NexoResourceFactory]] = {
+    "light": _light,
+    "led": _light,
+    "sensor": _sensor,
+    "analogsensor": _always(NexoAnalogSensor),
+    "output": _always(NexoOutput),
+    "temperature": _temperature,
+    "blind": _always(NexoBlind),
+    "group_blind": _always(NexoBlindGroup),
+    "group_dimmer": _always(NexoGroupDimmer),
+    "gate": _always(NexoGate),
+    "partition": _always(NexoPartition),
+}
+
+
+class NexoResourceRegistry:
+    """Builds resources from their definitions with one table lookup each.
+
+    Counts the resources built per type string, and per type the resource
+    ids of known types that could not be represented (a sensor without
+    state, an unknown temperature mode) and of unknown types. A rejected id
+    is counted once, however often the card sends its definition again.
+    """
+
+    def __init__(
+        self, factories: Mapping[str, NexoResourceFactory] = RESOURCE_FACTORIES
+    ) -> None:
+        """Initialize the registry."""
+        self._factories = factories
+        self.constructed: Counter[str] = Counter()
+        self.skipped: Counter[str] = Counter()
+        self.unknown: Counter[str] = Counter()
+        self._rejected_ids: set[int] = set()
+
+    def create(self, web_socket, definition: Mapping[str, Any]) -> NexoResource | None:
+        """Return the resource for a definition, None if it is not supported."""
+        nexo_type = definition["type"]
+        if (factory := self._factories.get(nexo_type)) is None:
+            if self._reject(definition, self.unknown):
+                _LOGGER.warning(
+                    "Unsupported resource type %s, id %s", nexo_type, definition["id"]
+                )
+            return None
+        if (resource_class := factory(definition)) is None:
+            self._reject(definition, self.skipped)
+            return None
+        self.constructed[nexo_type] += 1
+        return resource_class(web_socket, **definition)
+
+    def _reject(self, definition: Mapping[str, Any], counter: Counter[str]) -> bool:
+        """Count a rejected definition, return False if its id was seen before."""
+        if (resource_id := int(definition["id"])) in self._rejected_ids:
+            return False
+        self._rejected_ids.add(resource_id)
+        counter[definition["type"]] += 1
+        return True
+
+    def as_dict(self) -> dict[str, dict[str, int]]:
+        """Return the statistics as plain data."""
+        return {
+            "constructed": dict(self.constructed),
+            "skipped": dict(self.skipped),
+            "unknown": dict(self.unknown),
+        }
@@ -6,19 +6,29 @@ from .nexo_resource import NexoResource
 class NexoResourceSwitchable(NexoResource):
     """Base class for Nexo switchable resources."""
 
+    __slots__ = ("_is_on",)
+    _STATE_FIELDS = ("_is_on",)
+
+    def _decode_state(self, state) -> None:
+        self._is_on = bool(state.get("is_on"))
+
     @property
     def is_on(self) -> bool:
         """Return True if the resource is on, False if off."""
-        return bool(self.state["is_on"])
+        return self._is_on
 
     async def async_turn_on(self) -> None:
         """Turn on."""
         await self._async_send_cmd_operation(1)
+        self._apply_optimistic_state(is_on=1)
 
     async def async_turn_off(self) -> None:
         """Turn off."""
         await self._async_send_cmd_operation(0)
+        self._apply_optimistic_state(is_on=0)
 
     async def async_toggle(self) -> None:
         """Toggle state."""
-        await self._async_send_cmd_operation(0 if self.is_on else 1)
+        operation = 0 if self.is_on else 1
+        await self._async_send_cmd_operation(operation)
+        self._apply_optimistic_state(is_on=operation)
@@ -6,7 +6,9 @@ from .nexo_analog_sensor import NexoAnalogSensor
 class NexoTemperature(NexoAnalogSensor):
     """Nexo temperature sensor."""
 
-    @property
-    def value(self) -> float:
-        """Return the current temperature value."""
-        return super().value / 10
+    __slots__ = ()
+
+    def _decode_state(self, state) -> None:
+        value = state.get("value")
+        # The card reports tenths of a degree
+        self._value = value / 10 if value is not None else None
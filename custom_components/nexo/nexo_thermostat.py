@@ -8,7 +8,9 @@ from .nexo_temperature import NexoTemperature
 class NexoThermostat(NexoTemperature):
     """Nexo thermostat resource."""
 
+    __slots__ = ("_min", "_max", "_is_on", "_is_active")
     _NONE_VALUE: Final = 32767
+    _STATE_FIELDS = ("_value", "_is_on", "_is_active")
 
     def __init__(self, web_socket, min, max, *args, **kwargs) -> None:
         """Initialize the Nexo thermostat resource."""
@@ -26,15 +28,20 @@ class NexoThermostat(NexoTemperature):
         """Return the maximum thermostat temperature."""
         return self._max
 
+    def _decode_state(self, state) -> None:
+        super()._decode_state(state)
+        self._is_on = bool(state.get("is_on"))
+        self._is_active = bool(state.get("is_active"))
+
     @property
     def is_on(self) -> bool:
         """Return whether the thermostat is on."""
-        return self.state["is_on"]
+        return self._is_on
 
     @property
     def is_active(self) -> bool:
         """Return whether the thermostat is active."""
-        return self.state["is_active"]
+        return self._is_active
 
     async def async_turn_on(self) -> None:
         """Turn on the thermostat."""
@@ -53,4 +60,4 @@ class NexoThermostat(NexoTemperature):
     async def async_set_value(self, value) -> None:
         """Set the target temperature."""
         value = int(value * 10)
-        await self._async_send_cmd_operation(int(self.is_on), value)
+        await self._async_send_cmd_operation(int(self.is_on), value, coalesce=True)
@@ -0,0 +1,244 @@
+"""Nexo web socket transport."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import contextlib
+from enum import StrEnum
+import logging
+import random
+import time
+from typing import Any, Final
+
+import aiohttp
+
+from .nexo_frame_recorder import FRAME_OUTBOUND, NexoFrameRecorder
+from .nexo_metrics import NexoBridgeMetrics
+from .nexo_outbound_queue import NexoOutboundQueue
+from .nexo_profiler import NexoProfiler
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# Payload of the ping frames, the same one the card always received
+PING_PAYLOAD: Final = b'{"type":"ping"}'
+
+
+class NexoConnectionState(StrEnum):
+    """States of the connection to the multimedia card."""
+
+    CONNECTING = "connecting"
+    SYNCING = "syncing"
+    LIVE = "live"
+    BACKOFF = "backoff"
+    CLOSED = "closed"
+
+
+class NexoTransport:
+    """Web socket client running entirely on the Home Assistant event loop.
+
+    One task reads frames and hands them to ``on_message``, a second task
+    drains the outbound queue owned by the bridge, so no extra thread or
+    dispatcher is needed. The callback signatures follow the
+    ``websocket.WebSocketApp`` ones.
+
+    The connection moves through connecting, syncing (open, waiting for
+    initial_data), live and backoff. Reconnects wait with exponential
+    backoff and jitter. A connection attempt is given up after
+    ``connect_timeout`` seconds and a session is considered dead after
+    ``max_missed_pongs`` pings in a row go unanswered.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        outbound: NexoOutboundQueue,
+        metrics: NexoBridgeMetrics,
+        on_open: Callable[[NexoTransport], None],
+        on_message: Callable[[NexoTransport, str], None],
+        on_error: Callable[[NexoTransport, Any], None],
+        on_close: Callable[[NexoTransport, int | None, str | None], None],
+        backoff_min: float,
+        backoff_max: float,
+        connect_timeout: float,
+        ping_interval: float,
+        max_missed_pongs: int,
+    ) -> None:
+        """Initialize the transport."""
+        self._session = session
+        self._url = url
+        self._on_open = on_open
+        self._on_message = on_message
+        self._on_error = on_error
+        self._on_close = on_close
+        self._backoff_min = backoff_min
+        self._backoff_max = backoff_max
+        self._connect_timeout = connect_timeout
+        self._ping_interval = ping_interval
+        self._max_missed_pongs = max_missed_pongs
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+        self._outbound = outbound
+        self._metrics = metrics
+        self._reader_task: asyncio.Task | None = None
+        self._attempt = 0
+        self._down_since: float | None = None
+        self._ping_sent_at: float | None = None
+        self._missed_pongs = 0
+        self.state = NexoConnectionState.CLOSED
+        # Set while the bridge records traffic, gets every frame written
+        self.recorder: NexoFrameRecorder | None = None
+        # Set while the bridge profiles, resources wrap their sends in it
+        self.profiler: NexoProfiler | None = None
+
+    @property
+    def connected(self) -> bool:
+        """Return True if the web socket is open."""
+        return self._ws is not None and not self._ws.closed
+
+    def start(self) -> None:
+        """Start the reader task if it is not running yet."""
+        if self._reader_task is None or self._reader_task.done():
+            self._reader_task = asyncio.get_running_loop().create_task(self._run())
+
+    def set_live(self) -> None:
+        """Mark the session as synchronized with the card."""
+        if self.state is NexoConnectionState.SYNCING:
+            self._set_state(NexoConnectionState.LIVE)
+            self._attempt = 0
+
+    def send(self, message: str) -> None:
+        """Queue a message for the writer task without blocking."""
+        if not self.connected:
+            self._outbound.drop(message, "not connected")
+            return
+        self._outbound.put(message)
+
+    async def close(self) -> None:
+        """Stop the reader and writer tasks and close the web socket."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reader_task
+            self._reader_task = None
+        self._set_state(NexoConnectionState.CLOSED)
+
+    def _set_state(self, state: NexoConnectionState) -> None:
+        if state is not self.state:
+            _LOGGER.debug("Connection state %s -> %s", self.state, state)
+            self.state = state
+
+    def _backoff_delay(self) -> float:
+        # The exponent is capped, 2.0**1024 overflows after a long outage
+        delay = min(self._backoff_max, self._backoff_min * 2 ** min(self._attempt, 32))
+        # Equal jitter keeps at least half the delay and spreads the rest
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _run(self) -> None:
+        self._down_since = time.monotonic()
+        while True:
+            self._set_state(NexoConnectionState.CONNECTING)
+            try:
+                await self._run_session()
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as err:
+                self._metrics.connect_failures += 1
+                self._on_error(self, err)
+            delay = self._backoff_delay()
+            self._attempt += 1
+            self._set_state(NexoConnectionState.BACKOFF)
+            _LOGGER.debug("Reconnecting in %.1f s", delay)
+            await asyncio.sleep(delay)
+
+    async def _run_session(self) -> None:
+        # A powered off card would hold the handshake until the OS gives up
+        async with asyncio.timeout(self._connect_timeout):
+            ws = await self._session.ws_connect(self._url, autoping=False)
+        async with ws:
+            self._opened()
+            self._ws = ws
+            writer = asyncio.get_running_loop().create_task(self._write(ws))
+            pinger = asyncio.get_running_loop().create_task(self._ping(ws))
+            try:
+                self._on_open(self)
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        self._dispatch(msg.data)
+                    elif msg.type == aiohttp.WSMsgType.PONG:
+                        self._pong_received()
+                    elif msg.type == aiohttp.WSMsgType.PING:
+                        await ws.pong(msg.data)
+                    elif msg.type == aiohttp.WSMsgType.ERROR:
+                        self._on_error(self, ws.exception())
+            finally:
+                self._ws = None
+                self._down_since = time.monotonic()
+                writer.cancel()
+                pinger.cancel()
+                try:
+                    # Unlike awaiting the helpers, wait() neither raises what one
+                    # failed with on the closing socket nor swallows a
+                    # cancellation of this task
+                    await asyncio.wait((writer, pinger))
+                    for task in (writer, pinger):
+                        if not task.cancelled() and task.exception() is not None:
+                            _LOGGER.debug("Helper task failed: %s", task.exception())
+                finally:
+                    # Anything queued for the old session is stale after reconnect
+                    self._outbound.clear("connection closed")
+                    self._on_close(self, ws.close_code, None)
+
+    def _dispatch(self, message: str) -> None:
+        # A frame the bridge cannot handle must not end the session
+        try:
+            self._on_message(self, message)
+        except Exception:  # pylint: disable=broad-except
+            self._metrics.message_errors += 1
+            _LOGGER.exception("Error handling message from %s", self._url)
+
+    def _opened(self) -> None:
+        if self._metrics.sessions > 0:
+            self._metrics.reconnects += 1
+        self._metrics.sessions += 1
+        if self._down_since is not None:
+            self._metrics.total_downtime += time.monotonic() - self._down_since
+            self._down_since = None
+        self._ping_sent_at = None
+        self._missed_pongs = 0
+        self._set_state(NexoConnectionState.SYNCING)
+
+    async def _ping(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        while True:
+            await asyncio.sleep(self._ping_interval)
+            if self._ping_sent_at is not None:
+                self._missed_pongs += 1
+                self._metrics.missed_pongs += 1
+                if self._missed_pongs >= self._max_missed_pongs:
+                    _LOGGER.warning(
+                        "No pong for %s pings, reconnecting", self._missed_pongs
+                    )
+                    await ws.close()
+                    return
+            self._ping_sent_at = time.monotonic()
+            await ws.ping(PING_PAYLOAD)
+
+    def _pong_received(self) -> None:
+        if self._ping_sent_at is None:
+            return
+        rtt = time.monotonic() - self._ping_sent_at
+        self._ping_sent_at = None
+        self._missed_pongs = 0
+        self._metrics.last_ping_rtt = rtt
+        self._metrics.ping_rtt.observe(rtt)
+
+    async def _write(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        while True:
+            enqueued_at, message = await self._outbound.get()
+            try:
+                await ws.send_str(message)
+            except (aiohttp.ClientError, ConnectionResetError) as err:
+                self._outbound.drop(message, "send failed")
+                self._on_error(self, err)
+            else:
+                self._outbound.mark_sent(enqueued_at)
+                if self.recorder is not None:
+                    self.recorder.record(FRAME_OUTBOUND, message)
@@ -2,37 +2,168 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
 import logging
-from typing import Final
+import time
+from typing import Any, Final
 
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfTemperature
+from homeassistant.const import (
+    CONF_HOST,
+    EntityCategory,
+    UnitOfDataRate,
+    UnitOfInformation,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
-from .nexo import HANexo
+from .nexo import HANexo, async_setup_nexo_platform
+from .nexoBridge import NexoBridge
 from .nexo_analog_sensor import NexoAnalogSensor
 from .nexo_temperature import NexoTemperature
-from .nexoBridge import NexoBridge
 
 _LOGGER: Final = logging.getLogger(__name__)
 
+SCAN_INTERVAL = timedelta(seconds=30)
+
+
+@dataclass(frozen=True, kw_only=True)
+class NexoBridgeSensorEntityDescription(SensorEntityDescription):
+    """Describes a Nexo bridge diagnostic sensor."""
+
+    value_fn: Callable[[NexoBridge], Any]
+    # Report the change of the value per second instead of the value itself
+    rate: bool = False
+    attributes_fn: Callable[[NexoBridge], dict[str, Any]] | None = None
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else seconds * 1000
+
+
+BRIDGE_SENSORS: Final = (
+    NexoBridgeSensorEntityDescription(
+        key="messages_rate",
+        name="Messages",
+        native_unit_of_measurement="msg/s",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda bridge: bridge.metrics.messages_received,
+        rate=True,
+    ),
+    NexoBridgeSensorEntityDescription(
+        key="bytes_rate",
+        name="Received data rate",
+        device_class=SensorDeviceClass.DATA_RATE,
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda bridge: bridge.metrics.bytes_received,
+        rate=True,
+    ),
+    NexoBridgeSensorEntityDescription(
+        key="parse_time",
+        name="Average parse time",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda bridge: _ms(bridge.metrics.parse_time.average),
+    ),
+    NexoBridgeSensorEntityDescription(
+        key="publish_latency",
+        name="Average publish latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda bridge: _ms(bridge.metrics.publish_latency.average),
+    ),
+    NexoBridgeSensorEntityDescription(
+        key="queue_delay",
+        name="Average update queue delay",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda bridge: _ms(bridge.metrics.queue_delay.average),
+    ),
+    NexoBridgeSensorEntityDescription(
+        key="write_time",
+        name="Average state write time",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda bridge: _ms(bridge.metrics.write_time.average),
+    ),
+    NexoBridgeSensorEntityDescription(
+        key="outbound_queue_depth",
+        name="Outbound queue depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda bridge: bridge.outbound.depth,
+    ),
+    NexoBridgeSensorEntityDescription(
+        key="reconnects",
+        name="Reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda bridge: bridge.metrics.reconnects,
+    ),
+    NexoBridgeSensorEntityDescription(
+        key="ping_rtt",
+        name="Ping round trip time",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda bridge: _ms(bridge.metrics.last_ping_rtt),
+    ),
+    NexoBridgeSensorEntityDescription(
+        key="resources",
+        name="Resources",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda bridge: len(bridge.resources),
+        attributes_fn=lambda bridge: bridge.resource_counts(),
+    ),
+    NexoBridgeSensorEntityDescription(
+        key="initial_data_size",
+        name="Initial data size",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda bridge: bridge.metrics.initial_data_bytes,
+    ),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up."""
-    nexo: NexoBridge = hass.data[DOMAIN][entry.entry_id]
-
-    async_add_entities(
-        HANexoAnalogSensor(sensor)
-        for sensor in nexo.get_resources_by_type(NexoAnalogSensor)
+    async_setup_nexo_platform(
+        hass,
+        entry,
+        async_add_entities,
+        {
+            NexoAnalogSensor: HANexoAnalogSensor,
+            NexoTemperature: HANexoTemperatureSensor,
+        },
     )
+    nexo: NexoBridge = hass.data[DOMAIN][entry.entry_id]
     async_add_entities(
-        HANexoTemperatureSensor(temp)
-        for temp in nexo.get_resources_by_type(NexoTemperature)
+        HANexoBridgeSensor(nexo, entry, description) for description in BRIDGE_SENSORS
     )
 
 
@@ -61,3 +192,45 @@ class HANexoTemperatureSensor(HANexoAnalogSensor):
         self._attr_suggested_display_precision = 1
         self._attr_device_class = SensorDeviceClass.TEMPERATURE
         self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+
+
+class HANexoBridgeSensor(SensorEntity):
+    """Diagnostic sensor reporting a metric of the Nexo bridge."""
+
+    entity_description: NexoBridgeSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        nexo: NexoBridge,
+        entry: ConfigEntry,
+        description: NexoBridgeSensorEntityDescription,
+    ) -> None:
+        """Initialize the bridge sensor."""
+        self.entity_description = description
+        self._nexo = nexo
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=f"Nexo {entry.data[CONF_HOST]}",
+            manufacturer="Nexo",
+        )
+        self._last_sample: tuple[float, float] | None = None
+
+    async def async_update(self) -> None:
+        """Sample the bridge metric."""
+        description = self.entity_description
+        value = description.value_fn(self._nexo)
+        if description.rate:
+            now = time.monotonic()
+            last, self._last_sample = self._last_sample, (now, value)
+            # Counters restart with a new bridge, skip the sample spanning that
+            if last is None or value < last[1] or now <= last[0]:
+                value = None
+            else:
+                value = (value - last[1]) / (now - last[0])
+        self._attr_native_value = value
+        if description.attributes_fn is not None:
+            self._attr_extra_state_attributes = description.attributes_fn(self._nexo)
@@ -0,0 +1,87 @@
+"""Services of the Nexo integration."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import time
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DEFAULT_PROFILE_DURATION,
+    DOMAIN,
+    MAX_PROFILE_DURATION,
+    SERVICE_START_PROFILE,
+    SERVICE_START_RECORDING,
+    SERVICE_STOP_PROFILE,
+    SERVICE_STOP_RECORDING,
+)
+from .nexoBridge import NexoBridge
+
+ATTR_DURATION = "duration"
+
+START_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            cv.positive_int, vol.Range(min=1, max=MAX_PROFILE_DURATION)
+        ),
+    }
+)
+
+
+def _bridges(hass: HomeAssistant) -> dict[str, NexoBridge]:
+    """Return the bridges of all loaded config entries by entry id."""
+    return hass.data.get(DOMAIN, {})
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Nexo services."""
+
+    async def async_start_recording(call: ServiceCall) -> None:
+        """Record the traffic of every bridge into the config directory."""
+        for entry_id, nexo in _bridges(hass).items():
+            nexo.start_recording(hass.config.path(f"nexo_frames_{entry_id}.jsonl.gz"))
+
+    async def async_stop_recording(call: ServiceCall) -> None:
+        """Stop recording the traffic of every bridge."""
+        for nexo in _bridges(hass).values():
+            await nexo.async_stop_recording()
+
+    cancel_profile_timer: Callable[[], None] | None = None
+
+    async def async_start_profile(call: ServiceCall) -> None:
+        """Profile the hot path of every bridge for a bounded duration."""
+        nonlocal cancel_profile_timer
+        if not all([nexo.start_profiling() for nexo in _bridges(hass).values()]):
+            raise HomeAssistantError("Another profiler is already active")
+        if cancel_profile_timer is not None:
+            cancel_profile_timer()
+        cancel_profile_timer = async_call_later(
+            hass, call.data[ATTR_DURATION], async_stop_profile
+        )
+
+    async def async_stop_profile(call_or_now: ServiceCall | datetime) -> None:
+        """Write the profiles into the config directory."""
+        nonlocal cancel_profile_timer
+        if cancel_profile_timer is not None:
+            cancel_profile_timer()
+            cancel_profile_timer = None
+        stamp = int(time.time())
+        for entry_id, nexo in _bridges(hass).items():
+            await nexo.async_stop_profiling(
+                hass.config.path(f"nexo_profile_{entry_id}_{stamp}.cprof")
+            )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_START_PROFILE, async_start_profile, START_PROFILE_SCHEMA
+    )
+    hass.services.async_register(DOMAIN, SERVICE_STOP_PROFILE, async_stop_profile)
+    hass.services.async_register(DOMAIN, SERVICE_START_RECORDING, async_start_recording)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_RECORDING, async_stop_recording)
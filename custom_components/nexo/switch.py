@@ -10,8 +10,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
-from .nexo import HANexo
+from .nexo import HANexo, async_setup_nexo_platform
 from .nexo_output import NexoOutput
 
 _LOGGER: Final = logging.getLogger(__name__)
@@ -21,9 +20,8 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up."""
-    nexo = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities(
-        HANexoSwitch(switch) for switch in nexo.get_resources_by_type(NexoOutput)
+    async_setup_nexo_platform(
+        hass, entry, async_add_entities, {NexoOutput: HANexoSwitch}
     )
 
 
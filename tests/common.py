@@ -0,0 +1,74 @@
+"""Helpers for the Nexo tests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import gc
+import os
+from pathlib import Path
+import threading
+import tracemalloc
+from typing import Any
+
+from custom_components import nexo
+from custom_components.nexo.nexo_resource import NexoResource
+from custom_components.nexo.nexo_resource_registry import NexoResourceRegistry
+
+from .fake_nexo_card import generate_model
+
+NEXO_FILES = str(Path(nexo.__file__).parent / "*")
+# Blocks of pending storage writes and in-flight frames, a leaked bridge is more
+MEMORY_SLACK = 16 * 1024
+
+
+async def async_wait_until(condition: Callable[[], bool], timeout: float = 5) -> None:
+    """Wait until condition() is true, yielding to the loop in between."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0)
+
+
+def resources_in_use() -> tuple[int, int, int, int]:
+    """Return the threads, open file descriptors, tasks and memory in use.
+
+    Memory counts the blocks still allocated by lines of the integration, Home
+    Assistant's own registries and the test harness grow with every reload.
+    Needs tracemalloc to be tracing and a running loop.
+    """
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, NEXO_FILES)]
+    )
+    return (
+        threading.active_count(),
+        len(os.listdir("/proc/self/fd")),
+        len(asyncio.all_tasks()),
+        sum(stat.size for stat in snapshot.statistics("filename")),
+    )
+
+
+class FrameCollector:
+    """Stands in for the transport of resources, keeping the frames sent."""
+
+    profiler = None
+
+    def __init__(self) -> None:
+        """Initialize the collector."""
+        self.frames: list[str] = []
+
+    def send(self, message: str) -> None:
+        """Keep a frame instead of queueing it for the card."""
+        self.frames.append(message)
+
+
+def create_resource(kind: str, resource_id: int = 1, **state: Any) -> NexoResource:
+    """Return a resource of a RESOURCE_KINDS kind sending into a FrameCollector.
+
+    state overrides fields of the default state of the kind.
+    """
+    definition = generate_model(1, [kind], resource_id)["resources"][str(resource_id)]
+    definition["state"] = {**definition["state"], **state}
+    resource = NexoResourceRegistry().create(FrameCollector(), definition)
+    assert resource is not None
+    return resource
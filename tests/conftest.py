@@ -0,0 +1,51 @@
+"""Fixtures for the Nexo tests."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+
+import aiohttp
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.nexo import nexoBridge
+from custom_components.nexo.const import DOMAIN
+from custom_components.nexo.nexoBridge import NexoBridge
+
+from .fake_nexo_card import FakeNexoCard
+
+
+@pytest.fixture(autouse=True)
+def fast_reconnect(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Reconnect after milliseconds instead of seconds."""
+    monkeypatch.setattr(nexoBridge, "NEXO_BACKOFF_MIN", 0.01)
+    monkeypatch.setattr(nexoBridge, "NEXO_BACKOFF_MAX", 0.05)
+
+
+@pytest.fixture
+async def fake_card(socket_enabled: None) -> AsyncGenerator[FakeNexoCard]:
+    """Return a running card with one resource of every kind."""
+    async with FakeNexoCard() as card:
+        yield card
+
+
+@pytest.fixture
+async def nexo_bridge(fake_card: FakeNexoCard) -> AsyncGenerator[NexoBridge]:
+    """Return a bridge connected to the fake card."""
+    async with aiohttp.ClientSession() as session:
+        nexo = NexoBridge(fake_card.host, session)
+        await nexo.connect()
+        yield nexo
+        await nexo.async_close()
+
+
+@pytest.fixture
+def config_entry(hass: HomeAssistant, fake_card: FakeNexoCard) -> MockConfigEntry:
+    """Return a config entry of the fake card."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, title="Home", data={CONF_HOST: fake_card.host}
+    )
+    entry.add_to_hass(hass)
+    return entry
@@ -0,0 +1,368 @@
+"""Local stand-in for a Nexo multimedia card."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+import json
+import random
+import sys
+from typing import Any
+
+from aiohttp import WSMsgType, web
+
+from .frame_replayer import NexoFrameReplayer
+
+NEXO_PORT = 8766
+ALARM_CODE = "1234"
+# Thermostat value meaning "keep the set point"
+THERMOSTAT_NONE_VALUE = 32767
+
+
+def _light(resource_id: int) -> dict[str, Any]:
+    return {"type": "light", "state": {"is_on": 0}}
+
+
+def _dimmable_light(resource_id: int) -> dict[str, Any]:
+    return {"type": "light", "state": {"is_on": 1, "brightness": 50}}
+
+
+def _led(resource_id: int) -> dict[str, Any]:
+    return {"type": "led", "state": {"is_on": 0}}
+
+
+def _dimmable_led(resource_id: int) -> dict[str, Any]:
+    return {"type": "led", "state": {"is_on": 0, "brightness": 0}}
+
+
+def _blind(resource_id: int) -> dict[str, Any]:
+    return {"type": "blind", "state": {"blind_level": 100, "blind_op": 0}}
+
+
+def _temperature(resource_id: int) -> dict[str, Any]:
+    return {"type": "temperature", "mode": 1, "state": {"value": 215}}
+
+
+def _thermostat(resource_id: int) -> dict[str, Any]:
+    return {
+        "type": "temperature",
+        "mode": 2,
+        "min": 5,
+        "max": 30,
+        "state": {"value": 210, "is_on": 1, "is_active": 0},
+    }
+
+
+def _gate(resource_id: int) -> dict[str, Any]:
+    return {"type": "gate", "state": {"value": 2}}
+
+
+def _partition(resource_id: int) -> dict[str, Any]:
+    return {
+        "type": "partition",
+        "state": {
+            "is_armed": 0,
+            "is_suspended": 0,
+            "is_damaged": 0,
+            "is_alarming": 0,
+        },
+    }
+
+
+def _binary_sensor(resource_id: int) -> dict[str, Any]:
+    return {"type": "sensor", "state": {"value": 101}}
+
+
+def _analog_sensor(resource_id: int) -> dict[str, Any]:
+    return {"type": "analogsensor", "state": {"value": 512}}
+
+
+def _output(resource_id: int) -> dict[str, Any]:
+    return {"type": "output", "state": {"is_on": 0}}
+
+
+RESOURCE_KINDS: dict[str, Callable[[int], dict[str, Any]]] = {
+    "light": _light,
+    "dimmable_light": _dimmable_light,
+    "led": _led,
+    "dimmable_led": _dimmable_led,
+    "blind": _blind,
+    "temperature": _temperature,
+    "thermostat": _thermostat,
+    "gate": _gate,
+    "partition": _partition,
+    "binary_sensor": _binary_sensor,
+    "analog_sensor": _analog_sensor,
+    "output": _output,
+}
+
+
+def generate_model(
+    count: int, kinds: list[str] | None = None, start_id: int = 1
+) -> dict[str, Any]:
+    """Return an initial_data frame with count resources of the given kinds.
+
+    The kinds of RESOURCE_KINDS are used in turn, all of them by default.
+    """
+    factories = [RESOURCE_KINDS[kind] for kind in kinds or RESOURCE_KINDS]
+    resources = {}
+    for index in range(count):
+        resource_id = start_id + index
+        definition = factories[index % len(factories)](resource_id)
+        resources[str(resource_id)] = {
+            "id": resource_id,
+            "name": f"Resource {resource_id}",
+            **definition,
+        }
+    return {"op": "initial_data", "resources": resources}
+
+
+class FakeNexoCard:
+    """Web socket server speaking the multimedia card protocol.
+
+    Sends the model as initial_data to every client, answers pings and
+    applies resource commands to the model, confirming each with a
+    data_update like the card does. Tests drive updates with send_update,
+    update storms with update_storm and outages with disconnect.
+    """
+
+    def __init__(
+        self,
+        model: dict[str, Any] | None = None,
+        host: str = "127.0.0.1",
+        port: int = NEXO_PORT,
+        answer_pings: bool = True,
+        confirm_commands: bool = True,
+        hold_initial_data: bool = False,
+    ) -> None:
+        """Initialize the card."""
+        self.model = model if model is not None else generate_model(12)
+        self.host = host
+        self.port = port
+        self.answer_pings = answer_pings
+        self.confirm_commands = confirm_commands
+        # Keeps initial_data back until release_initial_data, like a slow boot
+        self.hold_initial_data = hold_initial_data
+        # Decoded command frames in the order they arrived
+        self.commands: list[dict[str, Any]] = []
+        self.connections = 0
+        self.pings = 0
+        self._clients: set[web.WebSocketResponse] = set()
+        self._runner: web.AppRunner | None = None
+        self._command_received = asyncio.Event()
+
+    @property
+    def clients(self) -> int:
+        """Return the number of connected clients."""
+        return len(self._clients)
+
+    @property
+    def resources(self) -> dict[str, dict[str, Any]]:
+        """Return the resource definitions by id string."""
+        return self.model["resources"]
+
+    async def start(self) -> None:
+        """Start listening."""
+        app = web.Application()
+        app.router.add_get("/", self._handle)
+        self._runner = web.AppRunner(app, handle_signals=False)
+        await self._runner.setup()
+        await web.TCPSite(
+            self._runner, self.host, self.port, reuse_address=True
+        ).start()
+
+    async def stop(self) -> None:
+        """Disconnect every client and stop listening."""
+        await self.disconnect()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> FakeNexoCard:
+        """Start the card."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Stop the card."""
+        await self.stop()
+
+    async def disconnect(self) -> None:
+        """Close the connection of every client, as a card reboot would."""
+        for ws in list(self._clients):
+            await ws.close()
+
+    async def broadcast(self, frame: str) -> None:
+        """Send a raw frame to every client."""
+        for ws in list(self._clients):
+            if not ws.closed:
+                await ws.send_str(frame)
+
+    async def send_update(self, resource_id: int, **state: Any) -> None:
+        """Change the state of a resource and send the data_update."""
+        resource = self.resources[str(resource_id)]
+        resource["state"] = {**resource["state"], **state}
+        await self.broadcast(self._data_update([resource]))
+
+    async def update_storm(
+        self, frames: int, rate: float | None = None, per_frame: int = 1
+    ) -> None:
+        """Send frames data_updates toggling random resources.
+
+        rate is in frames per second, None sends as fast as possible.
+        """
+        resources = list(self.resources.values())
+        for _ in range(frames):
+            batch = random.sample(resources, min(per_frame, len(resources)))
+            for resource in batch:
+                resource["state"] = _toggled(resource)
+            await self.broadcast(self._data_update(batch))
+            if rate is not None:
+                await asyncio.sleep(1 / rate)
+
+    async def release_initial_data(self) -> None:
+        """Send the held back initial_data to every client."""
+        self.hold_initial_data = False
+        await self.broadcast(json.dumps(self.model))
+
+    async def replay(self, path: str, speed: float = 0) -> float:
+        """Send the frames a bridge received in a capture, return the duration.
+
+        speed scales the recorded gaps, 0 sends as fast as possible.
+        """
+        replayer = await NexoFrameReplayer.async_load(path, speed)
+        return await replayer.replay(self.broadcast)
+
+    async def wait_for_commands(self, count: int, timeout: float = 5) -> None:
+        """Wait until count commands were received in total."""
+        async with asyncio.timeout(timeout):
+            while len(self.commands) < count:
+                self._command_received.clear()
+                await self._command_received.wait()
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(autoping=False)
+        await ws.prepare(request)
+        self.connections += 1
+        self._clients.add(ws)
+        try:
+            if not self.hold_initial_data:
+                await ws.send_str(json.dumps(self.model))
+            async for msg in ws:
+                if msg.type == WSMsgType.PING:
+                    self.pings += 1
+                    if self.answer_pings:
+                        await ws.pong(msg.data)
+                elif msg.type == WSMsgType.TEXT:
+                    await self._handle_frame(json.loads(msg.data))
+        finally:
+            self._clients.discard(ws)
+        return ws
+
+    async def _handle_frame(self, frame: dict[str, Any]) -> None:
+        if frame.get("type") != "resource":
+            return
+        self.commands.append(frame)
+        self._command_received.set()
+        resource = self.resources.get(str(frame["id"]))
+        if resource is None or not self._apply(resource, frame["cmd"]):
+            return
+        if self.confirm_commands:
+            await self.broadcast(self._data_update([resource]))
+
+    def _apply(self, resource: dict[str, Any], cmd: dict[str, Any]) -> bool:
+        """Apply a command to a resource, return False if the card ignores it."""
+        state = dict(resource["state"])
+        operation = cmd.get("operation")
+        match resource["type"]:
+            case "light" | "led" | "output":
+                state["is_on"] = operation
+                if "brightness" in cmd:
+                    state["brightness"] = cmd["brightness"]
+            case "blind":
+                state["blind_op"] = cmd["blind_op"]
+                if "blind_level" in cmd:
+                    state["blind_level"] = cmd["blind_level"]
+            case "temperature":
+                state["is_on"] = operation
+                if cmd.get("value", THERMOSTAT_NONE_VALUE) != THERMOSTAT_NONE_VALUE:
+                    state["value"] = cmd["value"]
+            case "gate":
+                state["value"] = 1 if state["value"] == 2 else 2
+            case "partition":
+                if cmd.get("password") != ALARM_CODE:
+                    return False
+                state["is_armed"] = operation
+            case _:
+                return False
+        resource["state"] = state
+        return True
+
+    @staticmethod
+    def _data_update(resources: list[dict[str, Any]]) -> str:
+        return json.dumps(
+            {
+                "op": "data_update",
+                "resources": {
+                    str(resource["id"]): {
+                        "id": resource["id"],
+                        "state": resource["state"],
+                    }
+                    for resource in resources
+                },
+            }
+        )
+
+
+def _toggled(resource: dict[str, Any]) -> dict[str, Any]:
+    """Return a changed state for a resource of any kind."""
+    state = dict(resource["state"])
+    if "is_on" in state:
+        state["is_on"] = 1 - state["is_on"]
+    elif "blind_level" in state:
+        state["blind_level"] = 100 - state["blind_level"]
+    elif "is_armed" in state:
+        state["is_armed"] = 1 - state["is_armed"]
+    elif resource["type"] in ("sensor", "gate"):
+        state["value"] = {101: 102, 102: 101, 1: 2, 2: 1}[state["value"]]
+    else:
+        state["value"] += 1
+    return state
+
+
+async def serve_cards(hosts: list[str], resources: int) -> None:
+    """Run a card on each host, driven by commands on stdin.
+
+    The cards number their resources apart, so their entities do not clash in
+    one Home Assistant. Prints "ready" once every card listens. Each "storm <frames> <per_frame>"
+    line sends an update storm from every card and prints "done" when sent.
+    The cards stop at the end of stdin.
+    """
+    cards = [
+        FakeNexoCard(generate_model(resources, start_id=index * resources + 1), host)
+        for index, host in enumerate(hosts)
+    ]
+    await asyncio.gather(*(card.start() for card in cards))
+    try:
+        print("ready", flush=True)
+        while line := await asyncio.to_thread(sys.stdin.readline):
+            _, frames, per_frame = line.split()
+            await asyncio.gather(
+                *(
+                    card.update_storm(int(frames), per_frame=int(per_frame))
+                    for card in cards
+                )
+            )
+            print("done", flush=True)
+    finally:
+        await asyncio.gather(*(card.stop() for card in cards))
+
+
+if __name__ == "__main__":
+    # Runs the cards of the scale test outside of the process measured
+    parser = argparse.ArgumentParser(description=serve_cards.__doc__)
+    parser.add_argument("--resources", type=int, default=12)
+    parser.add_argument("hosts", nargs="+")
+    args = parser.parse_args()
+    asyncio.run(serve_cards(args.hosts, args.resources))
@@ -0,0 +1,69 @@
+"""Replayer for captures of the Nexo frame recorder."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import gzip
+import inspect
+import time
+
+from custom_components.nexo.nexo_codec import decode
+from custom_components.nexo.nexo_frame_recorder import FRAME_INBOUND
+
+
+def read_frames(path: str, direction: str | None = FRAME_INBOUND):
+    """Return the (time, frame) pairs of a capture, all directions for None."""
+    frames = []
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            record = decode(line)
+            if direction is None or record["dir"] == direction:
+                frames.append((record["t"], record["frame"]))
+    return frames
+
+
+class NexoFrameReplayer:
+    """Feeds a capture of the NexoFrameRecorder back in its original rhythm.
+
+    ``speed`` scales the recorded gaps, 1 replays in real time, 10 ten times
+    faster and 0 as fast as possible. The frames go to ``on_frame``, which
+    may be a coroutine function, e.g. ``web_socket.send_str`` of a local
+    server standing in for the card, or a bridge directly::
+
+        replayer = await NexoFrameReplayer.async_load(path, speed=0)
+        await replayer.replay(lambda frame: bridge.on_message(bridge.ws, frame))
+    """
+
+    def __init__(self, frames: list[tuple[float, str]], speed: float = 1) -> None:
+        """Initialize the replayer."""
+        self.frames = frames
+        self.speed = speed
+
+    @classmethod
+    async def async_load(
+        cls, path: str, speed: float = 1, direction: str | None = FRAME_INBOUND
+    ) -> NexoFrameReplayer:
+        """Read a capture without blocking the event loop."""
+        frames = await asyncio.get_running_loop().run_in_executor(
+            None, read_frames, path, direction
+        )
+        return cls(frames, speed)
+
+    async def replay(self, on_frame: Callable[[str], Awaitable[None] | None]) -> float:
+        """Replay every frame and return the elapsed time in seconds."""
+        started = time.monotonic()
+        if not self.frames:
+            return 0.0
+        first = self.frames[0][0]
+        for recorded_at, frame in self.frames:
+            if self.speed > 0:
+                # Sleep towards the absolute target so delays do not add up
+                delay = started + (recorded_at - first) / self.speed - time.monotonic()
+                await asyncio.sleep(max(delay, 0))
+            else:
+                # Still give the callbacks scheduled by the frame a chance to run
+                await asyncio.sleep(0)
+            if inspect.isawaitable(result := on_frame(frame)):
+                await result
+        return time.monotonic() - started
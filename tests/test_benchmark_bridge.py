@@ -0,0 +1,148 @@
+"""End-to-end benchmarks of the Nexo bridge against the fake card."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Coroutine, Generator
+from typing import Any
+
+import aiohttp
+import pytest
+
+from custom_components.nexo.nexo_codec import decode
+from custom_components.nexo.nexoBridge import NexoBridge
+
+from .common import async_wait_until
+from .fake_nexo_card import FakeNexoCard, generate_model
+
+# A large installation
+RESOURCES = 2000
+
+
+class BenchmarkRig:
+    """A fake card and a client session on a loop of their own.
+
+    pytest-benchmark times synchronous calls, so every round runs a
+    coroutine to completion on this loop.
+    """
+
+    def __init__(self, resources: int) -> None:
+        """Start the card."""
+        self.loop = asyncio.new_event_loop()
+        self.card = FakeNexoCard(generate_model(resources))
+        self.run(self.card.start())
+        self.session: aiohttp.ClientSession = self.run(self._async_session())
+
+    def run(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Run a coroutine on the rig's loop."""
+        return self.loop.run_until_complete(coro)
+
+    async def async_bridge(self) -> NexoBridge:
+        """Return a bridge connected to the card."""
+        nexo = NexoBridge(self.card.host, self.session)
+        await nexo.connect()
+        return nexo
+
+    def close(self) -> None:
+        """Stop the card and close the loop."""
+        self.run(self.session.close())
+        self.run(self.card.stop())
+        self.loop.close()
+
+    @staticmethod
+    async def _async_session() -> aiohttp.ClientSession:
+        return aiohttp.ClientSession()
+
+
+@pytest.fixture
+def rig(socket_enabled: None) -> Generator[BenchmarkRig]:
+    """Return a benchmark rig with a large card."""
+    rig = BenchmarkRig(RESOURCES)
+    yield rig
+    rig.close()
+
+
+@pytest.mark.benchmark(group="setup")
+def test_startup(benchmark, rig: BenchmarkRig) -> None:
+    """Benchmark a cold setup, connecting and building the model of a large card."""
+
+    async def startup() -> None:
+        nexo = await rig.async_bridge()
+        assert len(nexo.resources) == RESOURCES
+        await nexo.async_close()
+
+    benchmark.pedantic(lambda: rig.run(startup()), rounds=10, warmup_rounds=1)
+
+
+@pytest.mark.benchmark(group="setup")
+def test_warm_startup(benchmark, rig: BenchmarkRig) -> None:
+    """Benchmark a warm setup, building the model from the stored snapshot."""
+    nexo: NexoBridge = rig.run(rig.async_bridge())
+    # The snapshot as Home Assistant storage keeps it on disk
+    stored = json.dumps(nexo.snapshot())
+    rig.run(nexo.async_close())
+
+    async def startup() -> None:
+        nexo = NexoBridge(rig.card.host, rig.session)
+        nexo.load_snapshot(decode(stored))
+        await nexo.connect()
+        assert len(nexo.resources) == RESOURCES
+        await nexo.async_close()
+
+    benchmark.pedantic(lambda: rig.run(startup()), rounds=10, warmup_rounds=1)
+
+
+def test_update_throughput(benchmark, rig: BenchmarkRig) -> None:
+    """Benchmark a storm of data_updates, 10 resources per frame, to state write."""
+    nexo: NexoBridge = rig.run(rig.async_bridge())
+    frames = 500
+    per_frame = 10
+    writes = 0
+
+    def write_state() -> None:
+        # Stands in for async_write_ha_state
+        nonlocal writes
+        writes += 1
+
+    for resource in nexo.resources.values():
+        resource.register_callback(write_state)
+
+    async def storm() -> None:
+        target = nexo.metrics.updates_published + frames * per_frame
+        await rig.card.update_storm(frames, per_frame=per_frame)
+        await async_wait_until(lambda: nexo.metrics.updates_published == target)
+
+    benchmark.pedantic(lambda: rig.run(storm()), rounds=5, warmup_rounds=1)
+    rig.run(nexo.async_close())
+
+    assert writes == nexo.metrics.updates_published
+    benchmark.extra_info["frames_per_round"] = frames
+    benchmark.extra_info["publish_latency"] = nexo.metrics.publish_latency.as_dict()
+
+
+def test_command_latency(benchmark, rig: BenchmarkRig) -> None:
+    """Benchmark the round trip of a command until the card confirms it."""
+    nexo: NexoBridge = rig.run(rig.async_bridge())
+    light = nexo.get_resource_by_id(1)
+
+    async def command() -> None:
+        confirmed = nexo.metrics.commands_confirmed
+        await light.async_toggle()
+        await async_wait_until(lambda: nexo.metrics.commands_confirmed > confirmed)
+
+    benchmark.pedantic(lambda: rig.run(command()), rounds=50, warmup_rounds=2)
+    rig.run(nexo.async_close())
+
+
+def test_reconnect(benchmark, rig: BenchmarkRig) -> None:
+    """Benchmark losing the connection until the model is resynchronized."""
+    nexo: NexoBridge = rig.run(rig.async_bridge())
+
+    async def reconnect() -> None:
+        resyncs = nexo.metrics.resyncs
+        await rig.card.disconnect()
+        await async_wait_until(lambda: nexo.metrics.resyncs > resyncs)
+
+    benchmark.pedantic(lambda: rig.run(reconnect()), rounds=10, warmup_rounds=1)
+    rig.run(nexo.async_close())
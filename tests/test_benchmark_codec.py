@@ -0,0 +1,75 @@
+"""Microbenchmarks of the Nexo protocol codec."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from custom_components.nexo.nexo_codec import (
+    command_prefix,
+    decode_frame,
+    encode_command,
+    peek_op,
+)
+
+from .fake_nexo_card import FakeNexoCard, generate_model
+
+RESOURCE_ID = 1234
+# A set level command of a blind, the most common coalesced command
+FIELDS = {"blind_op": 64, "blind_level": 70, "blind_slope": 255}
+EXPECTED = json.loads(encode_command(command_prefix(RESOURCE_ID), FIELDS))
+# The shapes of the frames a card sends, op after the body included
+FRAMES = {
+    "ping": '{"type":"ping"}',
+    "data_update": FakeNexoCard._data_update(
+        list(generate_model(1)["resources"].values())
+    ),
+    "data_update_op_last": json.dumps(
+        {"resources": generate_model(10)["resources"], "op": "data_update"}
+    ),
+    "initial_data": json.dumps(generate_model(2000)),
+}
+
+
+def _legacy_command(resource_id: int, **fields: Any) -> str:
+    """Build a frame with the f-strings the resources used before the codec."""
+    cmd = ",".join(f'"{key}":{value}' for key, value in fields.items())
+    return f'{{"type":"resource","id":{resource_id},"cmd":{{{cmd}}}}}'
+
+
+@pytest.mark.benchmark(group="encode_command")
+def test_encode_command(benchmark) -> None:
+    """Benchmark encoding a command with the cached prefix."""
+    prefix = command_prefix(RESOURCE_ID)
+
+    frame = benchmark(encode_command, prefix, FIELDS)
+
+    assert json.loads(frame) == EXPECTED
+
+
+@pytest.mark.benchmark(group="encode_command")
+def test_legacy_f_string(benchmark) -> None:
+    """Benchmark the f-string building encode_command replaced."""
+    frame = benchmark(_legacy_command, RESOURCE_ID, **FIELDS)
+
+    assert json.loads(frame) == EXPECTED
+
+
+@pytest.mark.parametrize("shape", FRAMES)
+def test_peek_op(benchmark, shape: str) -> None:
+    """Benchmark finding the op of each frame shape without decoding it."""
+    benchmark.group = f"frame {shape}"
+    frame = FRAMES[shape]
+
+    benchmark(peek_op, frame)
+
+
+@pytest.mark.parametrize("shape", FRAMES)
+def test_decode_frame(benchmark, shape: str) -> None:
+    """Benchmark decoding each frame shape, what peek_op saves for skipped frames."""
+    benchmark.group = f"frame {shape}"
+    frame = FRAMES[shape]
+
+    benchmark(decode_frame, frame)
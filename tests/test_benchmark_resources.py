@@ -0,0 +1,151 @@
+"""Microbenchmarks of the resource model with 10k synthetic resources."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+import itertools
+import operator
+import tracemalloc
+from typing import Any
+
+import aiohttp
+import pytest
+
+from custom_components.nexo.nexo_resource import NexoResource
+from custom_components.nexo.nexoBridge import NexoBridge
+
+from .fake_nexo_card import _toggled, generate_model
+
+RESOURCES = 10_000
+# A resource with its slots and command prefix, the raw state is the card's
+MAX_BYTES_PER_RESOURCE = 1024
+
+
+@pytest.fixture
+async def nexo_10k() -> AsyncGenerator[NexoBridge]:
+    """Return a bridge with the model of a card with 10k resources, unconnected."""
+    async with aiohttp.ClientSession() as session:
+        nexo = NexoBridge("127.0.0.1", session)
+        nexo.raw_data_model = generate_model(RESOURCES)
+        nexo.update_resources()
+        yield nexo
+
+
+def _filter_by_type(
+    nexo: NexoBridge, resource_type: type[NexoResource]
+) -> list[NexoResource]:
+    """Look up resources the way the bridge did before the index."""
+    return [
+        resource
+        for resource in nexo.resources.values()
+        if type(resource) is resource_type
+    ]
+
+
+@pytest.mark.benchmark(group="resources_by_type")
+def test_index_lookup(benchmark, nexo_10k: NexoBridge) -> None:
+    """Benchmark looking up the resources of every class through the index."""
+    types = nexo_10k.get_resource_types()
+
+    found = benchmark(lambda: [nexo_10k.get_resources_by_type(cls) for cls in types])
+
+    assert sum(map(len, found)) == RESOURCES
+
+
+@pytest.mark.benchmark(group="resources_by_type")
+def test_filter_lookup(benchmark, nexo_10k: NexoBridge) -> None:
+    """Benchmark the linear filter the index replaced."""
+    types = nexo_10k.get_resource_types()
+
+    found = benchmark(lambda: [_filter_by_type(nexo_10k, cls) for cls in types])
+
+    assert sum(map(len, found)) == RESOURCES
+
+
+def test_index_rebuild(benchmark, nexo_10k: NexoBridge) -> None:
+    """Benchmark rebuilding the model and its index on a resync."""
+    benchmark(nexo_10k.update_resources)
+
+    assert len(nexo_10k.resources) == RESOURCES
+
+
+def test_model_memory(nexo_10k: NexoBridge, record_property) -> None:
+    """Test the memory the resources of a 10k model take on top of the frame."""
+    tracemalloc.start()
+    try:
+        # Rebuilds every resource and the index, the frame is already decoded
+        nexo_10k.update_resources()
+        used = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    bytes_per_resource = used / RESOURCES
+    record_property("bytes_per_resource", bytes_per_resource)
+    assert bytes_per_resource < MAX_BYTES_PER_RESOURCE
+
+
+def test_apply_updates(benchmark, nexo_10k: NexoBridge) -> None:
+    """Benchmark applying a data_update changing the state of all 10k resources."""
+    resources = nexo_10k.raw_data_model["resources"]
+    frames = itertools.cycle(
+        [
+            {
+                "op": "data_update",
+                "resources": {
+                    key: {"id": resource["id"], "state": state(resource)}
+                    for key, resource in resources.items()
+                },
+            }
+            for state in (_toggled, lambda resource: resource["state"])
+        ]
+    )
+
+    published = 0
+    rounds = 0
+
+    def write_state() -> None:
+        nonlocal published
+        published += 1
+
+    for resource in nexo_10k.resources.values():
+        resource.register_callback(write_state)
+
+    async def apply() -> int:
+        nonlocal rounds
+        rounds += 1
+        dirty = nexo_10k.on_message_data_update(next(frames))
+        # Let the publish callback the frame scheduled run
+        await asyncio.sleep(0)
+        return dirty
+
+    # The bridge's loop, it is not running between the benchmark rounds
+    loop = nexo_10k._loop
+    dirty = benchmark.pedantic(lambda: loop.run_until_complete(apply()), rounds=50)
+
+    assert dirty == RESOURCES
+    assert published == nexo_10k.metrics.updates_published == rounds * RESOURCES
+
+
+def _property_reader(resource_type: type[NexoResource]) -> Callable[[Any], Any]:
+    """Return a getter of the state properties HA entities read from a class."""
+    return operator.attrgetter(
+        *{
+            name
+            for cls in resource_type.__mro__
+            for name, value in vars(cls).items()
+            if isinstance(value, property) and name not in ("id", "name")
+        }
+    )
+
+
+def test_read_properties(benchmark, nexo_10k: NexoBridge) -> None:
+    """Benchmark reading the state properties of all 10k resources, as HA does."""
+    readers = {cls: _property_reader(cls) for cls in nexo_10k.get_resource_types()}
+    resources = [
+        (readers[type(resource)], resource) for resource in nexo_10k.resources.values()
+    ]
+
+    states = benchmark(lambda: [read(resource) for read, resource in resources])
+
+    assert len(states) == RESOURCES
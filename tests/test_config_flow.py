@@ -0,0 +1,40 @@
+"""Tests for the nexo config and options flows."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.nexo.const import CONF_COMMAND_COALESCE_WINDOW, DOMAIN
+from custom_components.nexo.nexoBridge import NEXO_COMMAND_COALESCE_WINDOW
+
+from .fake_nexo_card import FakeNexoCard
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the nexo integration."""
+
+
+async def test_options_set_coalesce_window(
+    hass: HomeAssistant, fake_card: FakeNexoCard, config_entry: MockConfigEntry
+) -> None:
+    """Test the coalesce window option reaches the running bridge."""
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    nexo = hass.data[DOMAIN][config_entry.entry_id]
+    assert nexo.coalescer.window == NEXO_COMMAND_COALESCE_WINDOW
+
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    assert result["type"] is FlowResultType.FORM
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_COMMAND_COALESCE_WINDOW: 0}
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert config_entry.options == {CONF_COMMAND_COALESCE_WINDOW: 0}
+    assert nexo.coalescer.window == 0
+    assert fake_card.connections == 1
@@ -0,0 +1,301 @@
+"""Tests for setting up, reloading and unloading Nexo config entries."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import gc
+import logging
+import tracemalloc
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_HOST, STATE_OFF, STATE_UNAVAILABLE, Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.nexo import nexoBridge
+from custom_components.nexo.const import (
+    BRIDGE_PARK_TIMEOUT,
+    DATA_PLATFORMS,
+    DOMAIN,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from custom_components.nexo.nexo_resource import NexoResource
+from custom_components.nexo.nexoBridge import NexoBridge
+
+from .common import MEMORY_SLACK, async_wait_until, resources_in_use
+from .fake_nexo_card import FakeNexoCard
+
+RELOADS = 100
+LIGHT_ID = 1
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the nexo integration."""
+
+
+async def test_reload_does_not_leak(
+    hass: HomeAssistant,
+    caplog: pytest.LogCaptureFixture,
+    fake_card: FakeNexoCard,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test reloading an entry many times keeps threads, fds and memory flat.
+
+    A reload picks the parked bridge up again, test_unload_does_not_leak
+    covers bridges that are really closed.
+    """
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    # Debug mode captures a stack for every task, which dominates a reload
+    hass.loop.set_debug(False)
+    # Captured records keep the frames and states they were logged with
+    caplog.set_level(logging.ERROR)
+    tracemalloc.start()
+    try:
+        # Warm up caches and lazily created executors
+        for _ in range(5):
+            assert await hass.config_entries.async_reload(config_entry.entry_id)
+            await hass.async_block_till_done()
+        threads, fds, tasks, memory = resources_in_use()
+        for _ in range(RELOADS):
+            assert await hass.config_entries.async_reload(config_entry.entry_id)
+            await hass.async_block_till_done()
+        threads_after, fds_after, tasks_after, memory_after = resources_in_use()
+    finally:
+        tracemalloc.stop()
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert fake_card.connections == 1
+    assert threads_after <= threads
+    assert fds_after <= fds
+    assert tasks_after <= tasks
+    assert memory_after - memory < MEMORY_SLACK
+
+
+async def test_unload_does_not_leak(
+    hass: HomeAssistant, caplog: pytest.LogCaptureFixture, fake_card: FakeNexoCard
+) -> None:
+    """Test closing the bridge of an unloaded entry frees it and its resources.
+
+    Unlike a reload, nothing picks the parked bridge up again, so every cycle
+    opens and really closes a session.
+    """
+
+    async def cycle() -> None:
+        entry = MockConfigEntry(
+            domain=DOMAIN, title="Home", data={CONF_HOST: fake_card.host}
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=BRIDGE_PARK_TIMEOUT + 1)
+        )
+        await hass.async_block_till_done()
+        await async_wait_until(lambda: fake_card.clients == 0)
+        # Drops the entities and their registry entries with the entry
+        assert await hass.config_entries.async_remove(entry.entry_id)
+
+    hass.loop.set_debug(False)
+    caplog.set_level(logging.ERROR)
+    tracemalloc.start()
+    try:
+        for _ in range(5):
+            await cycle()
+        threads, fds, tasks, _ = resources_in_use()
+        for _ in range(RELOADS):
+            await cycle()
+        threads_after, fds_after, tasks_after, _ = resources_in_use()
+    finally:
+        tracemalloc.stop()
+
+    assert fake_card.connections == 5 + RELOADS
+    assert threads_after <= threads
+    assert fds_after <= fds
+    assert tasks_after <= tasks
+    assert not [
+        obj for obj in gc.get_objects() if isinstance(obj, (NexoBridge, NexoResource))
+    ]
+
+
+async def test_remove_closes_connection(
+    hass: HomeAssistant, fake_card: FakeNexoCard, config_entry: MockConfigEntry
+) -> None:
+    """Test removing an entry closes its connection to the card."""
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert fake_card.clients == 1
+
+    assert await hass.config_entries.async_remove(config_entry.entry_id)
+    await async_wait_until(lambda: fake_card.clients == 0)
+
+
+async def test_stop_closes_parked_connection(
+    hass: HomeAssistant, fake_card: FakeNexoCard, config_entry: MockConfigEntry
+) -> None:
+    """Test stopping Home Assistant closes the connection of an unloaded entry."""
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    # The bridge of an unloaded entry stays connected for a quick reload
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert fake_card.clients == 1
+
+    await hass.async_stop()
+
+    await async_wait_until(lambda: fake_card.clients == 0)
+
+
+async def test_late_initial_data_loads_platforms(
+    hass: HomeAssistant,
+    monkeypatch: pytest.MonkeyPatch,
+    fake_card: FakeNexoCard,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test initial_data arriving after setup timed out loads the platforms."""
+    monkeypatch.setattr(nexoBridge, "NEXO_INIT_TIMEOUT", 0.05)
+    fake_card.hold_initial_data = True
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    platforms = hass.data[DATA_PLATFORMS][config_entry.entry_id]
+    assert platforms == {Platform.SENSOR}
+
+    await fake_card.release_initial_data()
+    await async_wait_until(lambda: Platform.LIGHT in platforms)
+    await hass.async_block_till_done()
+
+    assert platforms == {
+        Platform.ALARM_CONTROL_PANEL,
+        Platform.BINARY_SENSOR,
+        Platform.CLIMATE,
+        Platform.COVER,
+        Platform.LIGHT,
+        Platform.LOCK,
+        Platform.SENSOR,
+        Platform.SWITCH,
+    }
+    entity_domains = {
+        entity.domain
+        for entity in er.async_entries_for_config_entry(
+            er.async_get(hass), config_entry.entry_id
+        )
+    }
+    assert entity_domains == {platform.value for platform in platforms}
+    assert hass.states.async_all(Platform.LIGHT)
+
+
+def snapshot_key(entry: MockConfigEntry) -> str:
+    """Return the storage key of the snapshot of an entry."""
+    return f"{DOMAIN}.{entry.entry_id}"
+
+
+async def async_save_snapshot(hass: HomeAssistant) -> None:
+    """Let the delayed snapshot save run."""
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+
+
+async def test_snapshot_saved_and_removed(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    fake_card: FakeNexoCard,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test the model is stored after initial_data and removed with the entry."""
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    await async_save_snapshot(hass)
+
+    stored = hass_storage[snapshot_key(config_entry)]
+    assert stored["version"] == STORAGE_VERSION
+    assert stored["data"] == hass.data[DOMAIN][config_entry.entry_id].snapshot()
+    assert len(stored["data"]["resources"]) == len(fake_card.resources)
+
+    assert await hass.config_entries.async_remove(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert snapshot_key(config_entry) not in hass_storage
+
+
+async def test_warm_start_from_snapshot(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    fake_card: FakeNexoCard,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test entities come from the snapshot and are unavailable until synced."""
+    hass_storage[snapshot_key(config_entry)] = {
+        "version": STORAGE_VERSION,
+        "key": snapshot_key(config_entry),
+        "data": {"resources": list(fake_card.resources.values())},
+    }
+    # The card has not booted yet, setup must not wait for it
+    fake_card.hold_initial_data = True
+    async with asyncio.timeout(1):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    # Resource entities, the bridge diagnostic sensors are always available
+    entity_ids = [
+        entity.entity_id
+        for entity in er.async_entries_for_config_entry(
+            er.async_get(hass), config_entry.entry_id
+        )
+        if entity.unique_id.isdigit()
+    ]
+    assert len(entity_ids) == len(fake_card.resources)
+    assert all(
+        hass.states.get(entity_id).state == STATE_UNAVAILABLE
+        for entity_id in entity_ids
+    )
+
+    await fake_card.release_initial_data()
+    nexo = hass.data[DOMAIN][config_entry.entry_id]
+    await async_wait_until(lambda: nexo.metrics.resyncs == 1)
+    await hass.async_block_till_done()
+
+    assert not any(
+        hass.states.get(entity_id).state == STATE_UNAVAILABLE
+        for entity_id in entity_ids
+    )
+    light_id = er.async_get(hass).async_get_entity_id(
+        Platform.LIGHT, DOMAIN, str(LIGHT_ID)
+    )
+    assert hass.states.get(light_id).state == STATE_OFF
+
+
+async def test_resource_dropped_on_reconnect(
+    hass: HomeAssistant, fake_card: FakeNexoCard, config_entry: MockConfigEntry
+) -> None:
+    """Test a resource missing from initial_data after a reconnect is removed."""
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    nexo = hass.data[DOMAIN][config_entry.entry_id]
+    registry = er.async_get(hass)
+    entity_id = registry.async_get_entity_id(Platform.LIGHT, DOMAIN, str(LIGHT_ID))
+    light = nexo.get_resource_by_id(LIGHT_ID)
+    assert hass.states.get(entity_id) is not None
+
+    del fake_card.resources[str(LIGHT_ID)]
+    await fake_card.disconnect()
+    await async_wait_until(lambda: nexo.metrics.resyncs == 1)
+    await hass.async_block_till_done()
+
+    assert nexo.get_resource_by_id(LIGHT_ID) is None
+    assert light not in nexo.get_resources_by_type(type(light))
+    assert hass.states.get(entity_id) is None
+    assert registry.async_get(entity_id) is None
+    # The other lights stay
+    assert hass.states.async_all(Platform.LIGHT)
@@ -0,0 +1,272 @@
+"""Tests for the Nexo bridge against the fake card."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import tracemalloc
+
+import aiohttp
+import pytest
+
+from custom_components.nexo import nexoBridge
+from custom_components.nexo.nexo_light import NexoLight
+from custom_components.nexo.nexo_transport import NexoConnectionState, NexoTransport
+from custom_components.nexo.nexoBridge import NexoBridge
+
+from .common import MEMORY_SLACK, async_wait_until, resources_in_use
+from .fake_nexo_card import NEXO_PORT, FakeNexoCard
+
+
+async def test_builds_model(fake_card: FakeNexoCard, nexo_bridge: NexoBridge) -> None:
+    """Test every resource of the card gets built."""
+    assert nexo_bridge.initialized
+    assert nexo_bridge.ws.state is NexoConnectionState.LIVE
+    assert set(nexo_bridge.resources) == {int(key) for key in fake_card.resources}
+
+
+async def test_data_update(fake_card: FakeNexoCard, nexo_bridge: NexoBridge) -> None:
+    """Test a data_update reaches the resource and its callbacks."""
+    light = nexo_bridge.get_resource_by_id(1)
+    calls = []
+    light.register_callback(lambda: calls.append(light.is_on))
+
+    await fake_card.send_update(1, is_on=1)
+    await async_wait_until(lambda: calls)
+
+    assert calls == [True]
+
+
+async def test_command_confirmed(
+    fake_card: FakeNexoCard, nexo_bridge: NexoBridge
+) -> None:
+    """Test a command reaches the card and its confirmation is tracked."""
+    light: NexoLight = nexo_bridge.get_resource_by_id(1)
+
+    await light.async_turn_on()
+    await async_wait_until(lambda: nexo_bridge.metrics.commands_confirmed == 1)
+
+    assert fake_card.commands == [
+        {"type": "resource", "id": 1, "cmd": {"operation": 1}}
+    ]
+    assert light.is_on
+
+
+async def test_update_storm(fake_card: FakeNexoCard, nexo_bridge: NexoBridge) -> None:
+    """Test every frame of a storm is handled."""
+    received = nexo_bridge.metrics.messages_received
+
+    await fake_card.update_storm(200, per_frame=5)
+    await async_wait_until(
+        lambda: nexo_bridge.metrics.messages_received == received + 200
+    )
+
+    assert nexo_bridge.metrics.message_errors == 0
+
+
+async def test_reconnect_resyncs(
+    fake_card: FakeNexoCard, nexo_bridge: NexoBridge
+) -> None:
+    """Test the bridge reconnects and resynchronizes after a card reboot."""
+    fake_card.resources["1"]["state"] = {"is_on": 1}
+
+    await fake_card.disconnect()
+    await async_wait_until(lambda: nexo_bridge.metrics.resyncs == 1)
+
+    assert fake_card.connections == 2
+    assert nexo_bridge.metrics.reconnects == 1
+    assert nexo_bridge.get_resource_by_id(1).is_on
+    assert nexo_bridge.ws.state is NexoConnectionState.LIVE
+
+
+async def test_resync_is_not_an_update(
+    fake_card: FakeNexoCard, nexo_bridge: NexoBridge
+) -> None:
+    """Test a resync neither counts as updates nor confirms a command in flight."""
+    fake_card.confirm_commands = False
+    light: NexoLight = nexo_bridge.get_resource_by_id(1)
+    await light.async_turn_on()
+    await fake_card.wait_for_commands(1)
+
+    await fake_card.disconnect()
+    await async_wait_until(lambda: nexo_bridge.metrics.resyncs == 1)
+
+    assert nexo_bridge.metrics.last_resync_changed == 0
+    assert nexo_bridge.metrics.updates_received == 0
+    assert nexo_bridge.metrics.updates_suppressed == 0
+    assert nexo_bridge.metrics.commands_confirmed == 0
+    assert nexo_bridge.command_tracker.in_flight == 1
+
+
+async def test_missed_pongs_reconnect(
+    monkeypatch: pytest.MonkeyPatch, socket_enabled: None
+) -> None:
+    """Test a card that stops answering pings gets reconnected."""
+    monkeypatch.setattr(nexoBridge, "NEXO_RECONNECT_TIMEOUT", 0.02)
+    async with FakeNexoCard(answer_pings=False) as card:
+        async with aiohttp.ClientSession() as session:
+            nexo = NexoBridge(card.host, session)
+            await nexo.connect()
+            await async_wait_until(lambda: nexo.metrics.reconnects >= 1)
+            await nexo.async_close()
+
+        assert nexo.metrics.missed_pongs >= 2
+
+
+async def test_connect_timeout(
+    monkeypatch: pytest.MonkeyPatch, socket_enabled: None
+) -> None:
+    """Test a card that never answers the handshake is retried after the timeout."""
+    monkeypatch.setattr(nexoBridge, "NEXO_CONNECT_TIMEOUT", 0.1)
+    monkeypatch.setattr(nexoBridge, "NEXO_INIT_TIMEOUT", 0)
+    writers: list[asyncio.StreamWriter] = []
+    server = await asyncio.start_server(
+        lambda reader, writer: writers.append(writer), "127.0.0.1", NEXO_PORT
+    )
+    async with aiohttp.ClientSession() as session:
+        nexo = NexoBridge("127.0.0.1", session)
+        await nexo.connect()
+        assert nexo.ws.state is NexoConnectionState.CONNECTING
+        await async_wait_until(
+            lambda: nexo.ws.state is NexoConnectionState.BACKOFF, timeout=1
+        )
+        await nexo.async_close()
+    for writer in writers:
+        writer.close()
+    server.close()
+    await server.wait_closed()
+
+    assert nexo.metrics.connect_failures == 1
+    assert nexo.metrics.sessions == 0
+
+
+async def test_backoff_after_long_outage(nexo_bridge: NexoBridge) -> None:
+    """Test the reconnect delay stays capped after thousands of attempts."""
+    nexo_bridge.ws._attempt = 5000
+
+    assert nexo_bridge.ws._backoff_delay() <= nexoBridge.NEXO_BACKOFF_MAX
+
+
+async def test_close_while_session_ends(
+    monkeypatch: pytest.MonkeyPatch, fake_card: FakeNexoCard
+) -> None:
+    """Test closing while the session is being cleaned up stops the transport."""
+
+    release = asyncio.Event()
+    stopped = asyncio.Event()
+
+    async def slow_ping(self, ws) -> None:
+        try:
+            await asyncio.Event().wait()
+        finally:
+            # Keeps the session cleanup waiting for the helpers
+            await release.wait()
+            stopped.set()
+
+    monkeypatch.setattr(NexoTransport, "_ping", slow_ping)
+    async with aiohttp.ClientSession() as session:
+        nexo = NexoBridge(fake_card.host, session)
+        await nexo.connect()
+        await fake_card.disconnect()
+        await async_wait_until(lambda: not nexo.ws.connected)
+        async with asyncio.timeout(1):
+            await nexo.async_close()
+        release.set()
+        await stopped.wait()
+
+    assert nexo.ws.state is NexoConnectionState.CLOSED
+    assert fake_card.connections == 1
+
+
+async def test_close_does_not_leak(
+    caplog: pytest.LogCaptureFixture, fake_card: FakeNexoCard
+) -> None:
+    """Test connecting and closing many bridges keeps threads, fds and memory flat."""
+
+    async def cycle() -> None:
+        nexo = NexoBridge(fake_card.host, session)
+        await nexo.connect()
+        await nexo.async_close()
+
+    # Captured records keep the frames and states they were logged with
+    caplog.set_level(logging.ERROR)
+    tracemalloc.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            for _ in range(5):
+                await cycle()
+            await async_wait_until(lambda: fake_card.clients == 0)
+            threads, fds, tasks, memory = resources_in_use()
+            for _ in range(100):
+                await cycle()
+            await async_wait_until(lambda: fake_card.clients == 0)
+            threads_after, fds_after, tasks_after, memory_after = resources_in_use()
+    finally:
+        tracemalloc.stop()
+
+    assert fake_card.connections == 105
+    assert threads_after <= threads
+    assert fds_after <= fds
+    assert tasks_after <= tasks
+    assert memory_after - memory < MEMORY_SLACK
+
+
+async def test_index_follows_model(
+    fake_card: FakeNexoCard, nexo_bridge: NexoBridge
+) -> None:
+    """Test the per-class index follows resources removed and added."""
+    light = nexo_bridge.get_resource_by_id(1)
+
+    assert nexo_bridge.remove_resource(1) is light
+    assert light not in nexo_bridge.get_resources_by_type(NexoLight)
+    nexo_bridge.add_resource(fake_card.resources["1"])
+    lights = nexo_bridge.get_resources_by_type(NexoLight)
+
+    assert nexo_bridge.get_resource_by_id(1) in lights
+    assert {resource.id for resource in lights} == {
+        resource.id
+        for resource in nexo_bridge.resources.values()
+        if type(resource) is NexoLight
+    }
+
+
+async def test_frames_without_op_skipped(
+    fake_card: FakeNexoCard, nexo_bridge: NexoBridge
+) -> None:
+    """Test ping/pong and other frames without a handled op are not decoded."""
+    received = nexo_bridge.metrics.messages_received
+
+    for frame in ('{"type":"ping"}', '{"type":"pong"}', "not json"):
+        await fake_card.broadcast(frame)
+    await async_wait_until(
+        lambda: nexo_bridge.metrics.messages_received == received + 3
+    )
+
+    assert nexo_bridge.metrics.frames_skipped == 3
+    assert nexo_bridge.metrics.message_errors == 0
+    assert nexo_bridge.metrics.parse_time.count == 1
+
+
+async def test_snapshot_round_trip(
+    fake_card: FakeNexoCard, nexo_bridge: NexoBridge
+) -> None:
+    """Test a bridge loaded from a snapshot has the model, unavailable until synced."""
+    await fake_card.send_update(1, is_on=1)
+    await async_wait_until(lambda: nexo_bridge.get_resource_by_id(1).is_on)
+    snapshot = nexo_bridge.snapshot()
+
+    async with aiohttp.ClientSession() as session:
+        nexo = NexoBridge(fake_card.host, session)
+        nexo.load_snapshot(snapshot)
+
+        assert nexo.initialized
+        assert nexo.snapshot() == snapshot
+        assert nexo.get_resource_by_id(1).is_on
+        assert not any(resource.available for resource in nexo.resources.values())
+
+        await nexo.connect()
+        await async_wait_until(lambda: nexo.metrics.resyncs == 1)
+        await nexo.async_close()
+
+    assert all(resource.available for resource in nexo.resources.values())
+    assert nexo.metrics.last_resync_changed == len(fake_card.resources)
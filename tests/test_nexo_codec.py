@@ -0,0 +1,142 @@
+"""Tests for the Nexo protocol codec."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from custom_components.nexo.nexo_codec import (
+    OP_DATA_UPDATE,
+    OP_INITIAL_DATA,
+    command_prefix,
+    encode_command,
+    peek_op,
+)
+
+from .common import create_resource
+
+PREFIX = '{"type":"resource","id":7,"cmd":'
+
+
+@pytest.mark.parametrize(
+    ("kind", "state", "method", "args", "cmd"),
+    [
+        ("light", {"is_on": 0}, "async_turn_on", (), '{"operation":1}'),
+        ("light", {"is_on": 1}, "async_turn_off", (), '{"operation":0}'),
+        ("light", {"is_on": 1}, "async_toggle", (), '{"operation":0}'),
+        ("output", {"is_on": 0}, "async_toggle", (), '{"operation":1}'),
+        ("led", {"is_on": 0}, "async_turn_on", (), '{"operation":1}'),
+        (
+            "dimmable_light",
+            {},
+            "async_turn_brightness_on",
+            (128.6,),
+            '{"operation":1,"brightness":128}',
+        ),
+        ("blind", {}, "async_open", (), '{"blind_op":2}'),
+        ("blind", {}, "async_close", (), '{"blind_op":1}'),
+        ("blind", {}, "async_stop", (), '{"blind_op":0}'),
+        (
+            "blind",
+            {},
+            "async_setLevel",
+            (30,),
+            '{"blind_op":64,"blind_level":70,"blind_slope":255}',
+        ),
+        (
+            "thermostat",
+            {"is_on": 0},
+            "async_turn_on",
+            (),
+            '{"operation":1,"value":32767}',
+        ),
+        (
+            "thermostat",
+            {"is_on": 1},
+            "async_turn_off",
+            (),
+            '{"operation":0,"value":32767}',
+        ),
+        (
+            "thermostat",
+            {"is_on": 1},
+            "async_toggle",
+            (),
+            '{"operation":0,"value":32767}',
+        ),
+        (
+            "thermostat",
+            {"is_on": 1},
+            "async_set_value",
+            (21.5,),
+            '{"operation":1,"value":215}',
+        ),
+        ("partition", {}, "async_arm", ("1234",), '{"operation":1,"password":"1234"}'),
+        (
+            "partition",
+            {},
+            "async_disarm",
+            ("1234",),
+            '{"operation":0,"password":"1234"}',
+        ),
+        ("gate", {}, "async_toggle", (), '{"operation":2}'),
+    ],
+)
+async def test_command_frames(
+    kind: str, state: dict[str, Any], method: str, args: tuple, cmd: str
+) -> None:
+    """Test the exact frame every command puts on the wire."""
+    resource = create_resource(kind, 7, **state)
+
+    await getattr(resource, method)(*args)
+
+    assert resource.web_socket.frames == [PREFIX + cmd + "}"]
+    assert json.loads(resource.web_socket.frames[0])["cmd"] == json.loads(cmd)
+
+
+async def test_password_escaped() -> None:
+    """Test an alarm code with quotes and backslashes stays one JSON string."""
+    partition = create_resource("partition", 7)
+
+    await partition.async_arm('12"34\\')
+
+    frame = partition.web_socket.frames[0]
+    assert frame == PREFIX + r'{"operation":1,"password":"12\"34\\"}}'
+    assert json.loads(frame)["cmd"] == {"operation": 1, "password": '12"34\\'}
+
+
+def test_command_prefix_quotes_string_ids() -> None:
+    """Test string resource ids are encoded, not pasted into the frame."""
+    frame = encode_command(command_prefix('1"2'), {"operation": 1})
+
+    assert json.loads(frame) == {
+        "type": "resource",
+        "id": '1"2',
+        "cmd": {"operation": 1},
+    }
+
+
+@pytest.mark.parametrize(
+    ("frame", "op"),
+    [
+        ('{"op":"initial_data","resources":{}}', OP_INITIAL_DATA),
+        ('{ "op" : "data_update", "resources": {} }', OP_DATA_UPDATE),
+        # op after the body, as the card does not guarantee key order
+        (
+            '{"resources":{"5":{"id":5,"state":{"blind_op":2}}},"op":"data_update"}',
+            OP_DATA_UPDATE,
+        ),
+        ('{"op":"weather"}', "weather"),
+        ('{"type":"ping"}', None),
+        ('{"type":"pong"}', None),
+        ("ping", None),
+        ("", None),
+        # A name containing the key is escaped and must not be taken for it
+        ('{"type":"pong","name":"\\"op\\":\\"initial_data\\""}', None),
+    ],
+)
+def test_peek_op(frame: str, op: str | None) -> None:
+    """Test the op is found wherever it is and ping/pong frames have none."""
+    assert peek_op(frame) == op
@@ -0,0 +1,109 @@
+"""Tests for coalescing set commands of a resource."""
+
+from __future__ import annotations
+
+from collections.abc import Generator
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.nexo.nexo_codec import decode
+from custom_components.nexo.nexo_command_coalescer import NexoCommandCoalescer
+from custom_components.nexo.nexo_resource_dimmable import NexoResourceDimmable
+
+from .common import FrameCollector, create_resource
+
+WINDOW = 0.3
+
+
+@pytest.fixture
+def light(hass: HomeAssistant) -> Generator[NexoResourceDimmable]:
+    """Return a dimmable light whose commands go through a coalescer."""
+    light = create_resource("dimmable_light")
+    light.coalescer = NexoCommandCoalescer(WINDOW)
+    yield light
+    light.coalescer.cancel_all()
+
+
+def sent(light: NexoResourceDimmable) -> list[dict]:
+    """Return the commands the light sent so far."""
+    collector: FrameCollector = light.web_socket
+    return [decode(frame)["cmd"] for frame in collector.frames]
+
+
+def end_window(hass: HomeAssistant, windows: int = 1) -> None:
+    """Move the clock past the end of the coalesce window."""
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=WINDOW * windows + 0.01)
+    )
+
+
+async def test_latest_value_wins(
+    hass: HomeAssistant, light: NexoResourceDimmable
+) -> None:
+    """Test only the first and the latest brightness of a burst are sent."""
+    for brightness in (10, 20, 30, 40):
+        await light.async_turn_brightness_on(brightness)
+
+    assert sent(light) == [{"operation": 1, "brightness": 10}]
+
+    end_window(hass)
+
+    assert sent(light) == [
+        {"operation": 1, "brightness": 10},
+        {"operation": 1, "brightness": 40},
+    ]
+    assert light.coalescer.coalesced == 2
+
+
+async def test_flush_opens_next_window(
+    hass: HomeAssistant, light: NexoResourceDimmable
+) -> None:
+    """Test a flushed value starts a window and a quiet window ends the burst."""
+    await light.async_turn_brightness_on(10)
+    await light.async_turn_brightness_on(20)
+    end_window(hass)
+    # Held by the window the flush of 20 opened
+    await light.async_turn_brightness_on(30)
+
+    assert [cmd["brightness"] for cmd in sent(light)] == [10, 20]
+
+    end_window(hass, 2)
+    assert [cmd["brightness"] for cmd in sent(light)] == [10, 20, 30]
+
+    # Nothing was held in the last window, the burst is over
+    end_window(hass, 3)
+    await light.async_turn_brightness_on(40)
+
+    assert [cmd["brightness"] for cmd in sent(light)] == [10, 20, 30, 40]
+    assert light.coalescer.coalesced == 0
+
+
+async def test_turn_off_drops_held_brightness(
+    hass: HomeAssistant, light: NexoResourceDimmable
+) -> None:
+    """Test turning off is sent at once and discards a held brightness."""
+    await light.async_turn_brightness_on(10)
+    await light.async_turn_brightness_on(20)
+    await light.async_turn_off()
+    end_window(hass)
+
+    assert sent(light) == [
+        {"operation": 1, "brightness": 10},
+        {"operation": 0},
+    ]
+    assert light.coalescer.coalesced == 1
+
+
+async def test_zero_window_sends_everything(
+    hass: HomeAssistant, light: NexoResourceDimmable
+) -> None:
+    """Test a window of 0 turns coalescing off."""
+    light.coalescer.window = 0
+    for brightness in (10, 20, 30):
+        await light.async_turn_brightness_on(brightness)
+
+    assert [cmd["brightness"] for cmd in sent(light)] == [10, 20, 30]
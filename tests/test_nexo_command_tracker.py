@@ -0,0 +1,113 @@
+"""Tests for optimistic command states and their confirmation by the card."""
+
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    SERVICE_TURN_ON,
+    STATE_OFF,
+    STATE_ON,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.nexo import nexoBridge
+from custom_components.nexo.const import DOMAIN
+from custom_components.nexo.nexoBridge import NexoBridge
+
+from .common import async_wait_until
+from .fake_nexo_card import FakeNexoCard
+
+LIGHT_ID = 1
+ECHO_DELAY = 0.05
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the nexo integration."""
+
+
+@pytest.fixture
+async def nexo(
+    hass: HomeAssistant,
+    monkeypatch: pytest.MonkeyPatch,
+    fake_card: FakeNexoCard,
+    config_entry: MockConfigEntry,
+) -> NexoBridge:
+    """Return the bridge of a set up entry whose card confirms nothing itself."""
+    monkeypatch.setattr(nexoBridge, "NEXO_COMMAND_TIMEOUT", 0.2)
+    fake_card.confirm_commands = False
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN][config_entry.entry_id]
+
+
+async def turn_on_light(hass: HomeAssistant, fake_card: FakeNexoCard) -> str:
+    """Turn the light on through Home Assistant, return its entity id."""
+    entity_id = er.async_get(hass).async_get_entity_id(
+        LIGHT_DOMAIN, DOMAIN, str(LIGHT_ID)
+    )
+    assert hass.states.get(entity_id).state == STATE_OFF
+    await hass.services.async_call(
+        LIGHT_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: entity_id}, blocking=True
+    )
+    await fake_card.wait_for_commands(1)
+    return entity_id
+
+
+async def test_delayed_echo_confirms(
+    hass: HomeAssistant, fake_card: FakeNexoCard, nexo: NexoBridge
+) -> None:
+    """Test the state shows at once and a late echo confirms it."""
+    entity_id = await turn_on_light(hass, fake_card)
+
+    assert hass.states.get(entity_id).state == STATE_ON
+    assert nexo.command_tracker.in_flight == 1
+
+    await asyncio.sleep(ECHO_DELAY)
+    await fake_card.send_update(LIGHT_ID, is_on=1)
+    await async_wait_until(lambda: nexo.metrics.commands_confirmed == 1)
+
+    assert hass.states.get(entity_id).state == STATE_ON
+    assert nexo.command_tracker.in_flight == 0
+    assert nexo.metrics.commands_rolled_back == 0
+    rtt = nexo.metrics.command_rtt["NexoLight"]
+    assert rtt.count == 1
+    assert ECHO_DELAY <= rtt.max < nexoBridge.NEXO_COMMAND_TIMEOUT
+
+
+async def test_missing_echo_rolls_back(
+    hass: HomeAssistant, fake_card: FakeNexoCard, nexo: NexoBridge
+) -> None:
+    """Test the confirmed state comes back when the card never echoes."""
+    entity_id = await turn_on_light(hass, fake_card)
+    assert hass.states.get(entity_id).state == STATE_ON
+
+    await async_wait_until(lambda: nexo.metrics.commands_rolled_back == 1)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(entity_id).state == STATE_OFF
+    assert nexo.command_tracker.in_flight == 0
+    assert nexo.metrics.commands_confirmed == 0
+    assert "NexoLight" not in nexo.metrics.command_rtt
+
+
+async def test_different_echo_corrects(
+    hass: HomeAssistant, fake_card: FakeNexoCard, nexo: NexoBridge
+) -> None:
+    """Test an echo with another value replaces the optimistic state."""
+    entity_id = await turn_on_light(hass, fake_card)
+
+    await fake_card.send_update(LIGHT_ID, is_on=0)
+    await async_wait_until(lambda: nexo.metrics.commands_confirmed == 1)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(entity_id).state == STATE_OFF
+    assert nexo.command_tracker.in_flight == 0
+    assert nexo.metrics.commands_rolled_back == 0
+    assert nexo.metrics.command_rtt["NexoLight"].count == 1
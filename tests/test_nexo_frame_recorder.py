@@ -0,0 +1,63 @@
+"""Tests for recording and replaying the frames of a bridge."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import aiohttp
+
+from custom_components.nexo.nexo_codec import REDACTED, decode
+from custom_components.nexo.nexo_frame_recorder import FRAME_OUTBOUND
+from custom_components.nexo.nexoBridge import NexoBridge
+
+from .common import async_wait_until
+from .fake_nexo_card import ALARM_CODE, FakeNexoCard
+from .frame_replayer import read_frames
+
+PARTITION_ID = 9
+
+
+async def test_alarm_code_redacted(
+    fake_card: FakeNexoCard, nexo_bridge: NexoBridge, tmp_path: Path
+) -> None:
+    """Test the alarm code of arm and disarm commands never reaches the capture."""
+    path = str(tmp_path / "capture.jsonl.gz")
+    partition = nexo_bridge.get_resource_by_id(PARTITION_ID)
+
+    nexo_bridge.start_recording(path)
+    await partition.async_arm(ALARM_CODE)
+    await partition.async_disarm(ALARM_CODE)
+    await fake_card.wait_for_commands(2)
+    await async_wait_until(lambda: nexo_bridge.metrics.messages_received == 3)
+    await nexo_bridge.async_stop_recording()
+
+    commands = [decode(frame) for _, frame in read_frames(path, FRAME_OUTBOUND)]
+    assert [command["cmd"] for command in commands] == [
+        {"operation": 1, "password": REDACTED},
+        {"operation": 0, "password": REDACTED},
+    ]
+    assert not any(ALARM_CODE in frame for _, frame in read_frames(path, None))
+    assert fake_card.commands[0]["cmd"]["password"] == ALARM_CODE
+
+
+async def test_replay_capture(fake_card: FakeNexoCard, tmp_path: Path) -> None:
+    """Test a capture replayed by the card reproduces the recorded model."""
+    path = str(tmp_path / "capture.jsonl.gz")
+    async with aiohttp.ClientSession() as session:
+        nexo = NexoBridge(fake_card.host, session)
+        nexo.start_recording(path)
+        await nexo.connect()
+        await fake_card.update_storm(50, per_frame=3)
+        await async_wait_until(lambda: nexo.metrics.messages_received == 51)
+        await nexo.async_close()
+        recorded = {key: value.state for key, value in nexo.resources.items()}
+
+        # A card without resources, so the bridge only sees the capture
+        fake_card.model = {"op": "initial_data", "resources": {}}
+        nexo = NexoBridge(fake_card.host, session)
+        await nexo.connect()
+        await fake_card.replay(path)
+        await async_wait_until(lambda: nexo.metrics.messages_received == 52)
+        await nexo.async_close()
+
+    assert {key: value.state for key, value in nexo.resources.items()} == recorded
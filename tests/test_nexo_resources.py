@@ -0,0 +1,100 @@
+"""Tests for decoding the state of Nexo resources."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from .common import create_resource
+
+
+@pytest.mark.parametrize(
+    ("kind", "state", "expected"),
+    [
+        ("light", {"is_on": 1}, {"is_on": True}),
+        ("light", {}, {"is_on": False}),
+        ("output", {"is_on": 1}, {"is_on": True}),
+        ("output", {}, {"is_on": False}),
+        (
+            "dimmable_light",
+            {"is_on": 1, "brightness": 80},
+            {"is_on": True, "brightness": 80},
+        ),
+        (
+            "dimmable_led",
+            {"is_on": 1, "brightness": None},
+            {"is_on": True, "brightness": 0},
+        ),
+        ("dimmable_light", {}, {"is_on": False, "brightness": 0}),
+        (
+            "blind",
+            {"blind_level": 30, "blind_op": 1},
+            {"openPercentage": 70, "is_closing": True, "is_in_move": True},
+        ),
+        (
+            "blind",
+            {"blind_level": 0, "blind_op": 0},
+            {"openPercentage": 100, "is_opened": True, "is_in_move": False},
+        ),
+        (
+            "blind",
+            {},
+            {"openPercentage": None, "is_closed": False, "is_in_move": None},
+        ),
+        ("temperature", {"value": 215}, {"value": 21.5}),
+        ("temperature", {"value": None}, {"value": None}),
+        ("temperature", {}, {"value": None}),
+        (
+            "thermostat",
+            {"value": 210, "is_on": 1, "is_active": 1},
+            {"value": 21.0, "is_on": True, "is_active": True},
+        ),
+        ("thermostat", {}, {"value": None, "is_on": False, "is_active": False}),
+        ("gate", {"value": 1}, {"is_open": True}),
+        ("gate", {"value": 2}, {"is_open": False}),
+        ("gate", {}, {"is_open": None}),
+        (
+            "partition",
+            {"is_armed": 1, "is_alarming": 1},
+            {
+                "is_armed": True,
+                "is_suspended": False,
+                "is_damaged": False,
+                "is_alarming": True,
+            },
+        ),
+        (
+            "partition",
+            {},
+            {
+                "is_armed": False,
+                "is_suspended": False,
+                "is_damaged": False,
+                "is_alarming": False,
+            },
+        ),
+        ("binary_sensor", {"value": 102}, {"is_on": True}),
+        ("binary_sensor", {"value": 101}, {"is_on": False}),
+        ("binary_sensor", {}, {"is_on": None}),
+        ("analog_sensor", {"value": 512}, {"value": 512}),
+        ("analog_sensor", {}, {"value": None}),
+    ],
+)
+def test_decode_state(kind: str, state: dict[str, Any], expected: dict) -> None:
+    """Test every resource type decodes complete, partial and empty states."""
+    resource = create_resource(kind)
+
+    resource.update_state(state)
+
+    assert {name: getattr(resource, name) for name in expected} == expected
+    assert resource.state is state
+
+
+def test_update_reports_exposed_changes() -> None:
+    """Test only changes of decoded fields count as changes."""
+    light = create_resource("dimmable_light", is_on=1, brightness=50)
+
+    assert not light.update_state({"is_on": 1, "brightness": 50, "extra": 1})
+    assert light.update_state({"is_on": 1, "brightness": None})
+    assert not light.update_state({"is_on": 1})
@@ -0,0 +1,114 @@
+"""Scale test of many config entries sharing one Home Assistant."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_socket import socket_allow_hosts
+
+from custom_components.nexo.const import DOMAIN
+
+from .common import async_wait_until
+
+CARDS = 50
+RESOURCES = 200
+FRAMES = 100
+PER_FRAME = 5
+# The port of the card is fixed, so every card listens on its own address
+HOSTS = [f"127.0.0.{index}" for index in range(2, CARDS + 2)]
+ROOT = Path(__file__).parent.parent
+# Generous bounds, an entry of this size needs far less on any machine
+MAX_MEMORY_PER_ENTRY = 8 * 1024 * 1024
+MAX_CPU_PER_FRAME = 0.005
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the nexo integration."""
+
+
+@pytest.fixture
+async def cards(socket_enabled: None) -> AsyncGenerator[asyncio.subprocess.Process]:
+    """Return a process running a card on each of HOSTS.
+
+    Running them in their own process keeps their CPU time and memory out of
+    the figures measured here.
+    """
+    socket_allow_hosts(["127.0.0.1", *HOSTS])
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "tests.fake_nexo_card",
+        "--resources",
+        str(RESOURCES),
+        *HOSTS,
+        cwd=ROOT,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+    )
+    try:
+        assert await process.stdout.readline() == b"ready\n"
+        yield process
+    finally:
+        process.stdin.close()
+        await process.wait()
+
+
+async def test_fifty_cards(
+    hass: HomeAssistant,
+    cards: asyncio.subprocess.Process,
+    record_property: pytest.RecordProperty,
+) -> None:
+    """Test 50 config entries, measuring memory and CPU per entry."""
+    entries = [
+        MockConfigEntry(domain=DOMAIN, title=host, data={CONF_HOST: host})
+        for host in HOSTS
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+    # Debug mode captures a stack for every task
+    hass.loop.set_debug(False)
+
+    tracemalloc.start()
+    try:
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+        memory = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    bridges = [hass.data[DOMAIN][entry.entry_id] for entry in entries]
+
+    cpu = time.process_time()
+    cards.stdin.write(f"storm {FRAMES} {PER_FRAME}\n".encode())
+    await cards.stdin.drain()
+    assert await cards.stdout.readline() == b"done\n"
+    await async_wait_until(
+        lambda: all(nexo.metrics.messages_received == FRAMES + 1 for nexo in bridges),
+        timeout=30,
+    )
+    await hass.async_block_till_done()
+    cpu = time.process_time() - cpu
+
+    memory_per_entry = memory / CARDS
+    cpu_per_frame = cpu / (CARDS * FRAMES)
+    record_property("memory_per_entry", memory_per_entry)
+    record_property("cpu_per_frame", cpu_per_frame)
+    assert all(len(nexo.resources) == RESOURCES for nexo in bridges)
+    assert all(nexo.metrics.message_errors == 0 for nexo in bridges)
+    assert len(hass.states.async_entity_ids()) >= CARDS * RESOURCES
+    assert memory_per_entry < MAX_MEMORY_PER_ENTRY
+    assert cpu_per_frame < MAX_CPU_PER_FRAME
+
+    for entry in entries:
+        await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
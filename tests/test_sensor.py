@@ -0,0 +1,143 @@
+"""Tests for the diagnostic sensors of the Nexo bridge."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+
+from homeassistant.const import CONF_HOST, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_socket import socket_allow_hosts
+
+from custom_components.nexo.const import DOMAIN
+from custom_components.nexo.sensor import SCAN_INTERVAL, HANexoBridgeSensor
+
+from .common import async_wait_until
+from .fake_nexo_card import FakeNexoCard, generate_model
+
+SECOND_HOST = "127.0.0.2"
+ADDED_ID = 100
+LIGHT_ID = 1
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the nexo integration."""
+
+
+@pytest.fixture(autouse=True)
+def enable_bridge_sensors(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Enable the bridge sensors, which are disabled by default."""
+    monkeypatch.setattr(
+        HANexoBridgeSensor, "_attr_entity_registry_enabled_default", True
+    )
+
+
+@pytest.fixture
+async def second_card(socket_enabled: None) -> AsyncGenerator[FakeNexoCard]:
+    """Return a second running card on another loopback address."""
+    socket_allow_hosts(["127.0.0.1", SECOND_HOST])
+    async with FakeNexoCard(host=SECOND_HOST) as card:
+        yield card
+
+
+def sensor_entity_id(hass: HomeAssistant, entry: MockConfigEntry, key: str) -> str:
+    """Return the entity id of a bridge sensor of the entry."""
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor", DOMAIN, f"{entry.entry_id}_{key}"
+    )
+    assert entity_id is not None
+    return entity_id
+
+
+async def poll(hass: HomeAssistant) -> None:
+    """Let the sensors sample the bridge."""
+    async_fire_time_changed(hass, dt_util.utcnow() + SCAN_INTERVAL)
+    await hass.async_block_till_done()
+
+
+async def test_sensors_named_by_card(
+    hass: HomeAssistant, fake_card: FakeNexoCard, second_card: FakeNexoCard
+) -> None:
+    """Test two cards with the default title get their own device and sensors."""
+    entries = []
+    for card in (fake_card, second_card):
+        entry = MockConfigEntry(
+            domain=DOMAIN, title="Name of the device", data={CONF_HOST: card.host}
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        entries.append(entry)
+    await hass.async_block_till_done()
+
+    assert [sensor_entity_id(hass, entry, "resources") for entry in entries] == [
+        "sensor.nexo_127_0_0_1_resources",
+        "sensor.nexo_127_0_0_2_resources",
+    ]
+    device_registry = dr.async_get(hass)
+    for entry in entries:
+        device = device_registry.async_get_device({(DOMAIN, entry.entry_id)})
+        assert device is not None
+        assert device.name == f"Nexo {entry.data[CONF_HOST]}"
+        assert device.config_entries == {entry.entry_id}
+
+
+async def test_resources_sensor(
+    hass: HomeAssistant, fake_card: FakeNexoCard, config_entry: MockConfigEntry
+) -> None:
+    """Test the resources sensor counts the resources of every type."""
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    entity_id = sensor_entity_id(hass, config_entry, "resources")
+    await poll(hass)
+
+    state = hass.states.get(entity_id)
+    assert int(state.state) == len(fake_card.resources)
+    counts = {
+        name: value
+        for name, value in state.attributes.items()
+        if name.startswith("Nexo")
+    }
+    assert sum(counts.values()) == len(fake_card.resources)
+    # Lights and leds share a class
+    assert counts["NexoLight"] == 2
+    assert counts["NexoTemperature"] == 1
+
+    nexo = hass.data[DOMAIN][config_entry.entry_id]
+    fake_card.resources.update(
+        generate_model(1, ["temperature"], ADDED_ID)["resources"]
+    )
+    await fake_card.disconnect()
+    await async_wait_until(lambda: ADDED_ID in nexo.resources)
+    await poll(hass)
+
+    state = hass.states.get(entity_id)
+    assert int(state.state) == len(fake_card.resources)
+    assert state.attributes["NexoTemperature"] == 2
+
+
+async def test_messages_rate_sensor(
+    hass: HomeAssistant, fake_card: FakeNexoCard, config_entry: MockConfigEntry
+) -> None:
+    """Test the messages sensor reports a rate once it has two samples."""
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    entity_id = sensor_entity_id(hass, config_entry, "messages_rate")
+    nexo = hass.data[DOMAIN][config_entry.entry_id]
+
+    await poll(hass)
+    assert hass.states.get(entity_id).state == STATE_UNKNOWN
+
+    received = nexo.metrics.messages_received
+    for is_on in (1, 0, 1):
+        await fake_card.send_update(LIGHT_ID, is_on=is_on)
+    await async_wait_until(lambda: nexo.metrics.messages_received == received + 3)
+    await poll(hass)
+
+    assert float(hass.states.get(entity_id).state) > 0
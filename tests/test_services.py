@@ -0,0 +1,141 @@
+"""Tests for the profiling and recording services of the Nexo integration."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import gzip
+import json
+from pathlib import Path
+import pstats
+
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.nexo.const import (
+    DOMAIN,
+    SERVICE_START_PROFILE,
+    SERVICE_START_RECORDING,
+    SERVICE_STOP_PROFILE,
+    SERVICE_STOP_RECORDING,
+)
+from custom_components.nexo.nexo_frame_recorder import FRAME_OUTBOUND
+from custom_components.nexo.nexoBridge import NexoBridge
+
+from .common import async_wait_until
+from .fake_nexo_card import FakeNexoCard
+from .frame_replayer import read_frames
+
+LIGHT_ID = 1
+UPDATES = 10
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the nexo integration."""
+
+
+@pytest.fixture
+async def nexo(
+    hass: HomeAssistant, tmp_path: Path, config_entry: MockConfigEntry
+) -> NexoBridge:
+    """Return the bridge of a set up entry writing into tmp_path."""
+    hass.config.config_dir = str(tmp_path)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN][config_entry.entry_id]
+
+
+async def toggle_light(fake_card: FakeNexoCard, nexo: NexoBridge) -> None:
+    """Have the card send UPDATES updates and wait until they are handled."""
+    received = nexo.metrics.messages_received
+    for index in range(UPDATES):
+        await fake_card.send_update(LIGHT_ID, is_on=index % 2)
+    await async_wait_until(lambda: nexo.metrics.messages_received == received + UPDATES)
+
+
+def profiled_functions(path: Path) -> set[str]:
+    """Return the names of the functions in a profile."""
+    return {function for _, _, function in pstats.Stats(str(path)).stats}
+
+
+async def test_profile_services(
+    hass: HomeAssistant,
+    tmp_path: Path,
+    fake_card: FakeNexoCard,
+    config_entry: MockConfigEntry,
+    nexo: NexoBridge,
+) -> None:
+    """Test start_profile and stop_profile write a profile pstats can load."""
+    await hass.services.async_call(DOMAIN, SERVICE_START_PROFILE, blocking=True)
+    await toggle_light(fake_card, nexo)
+    await hass.services.async_call(DOMAIN, SERVICE_STOP_PROFILE, blocking=True)
+
+    [path] = tmp_path.glob(f"nexo_profile_{config_entry.entry_id}_*.cprof")
+    assert "_handle_message" in profiled_functions(path)
+    assert nexo.profiler is None
+
+
+async def test_profile_duration(
+    hass: HomeAssistant,
+    tmp_path: Path,
+    fake_card: FakeNexoCard,
+    nexo: NexoBridge,
+) -> None:
+    """Test the profile is written when its duration runs out."""
+    await hass.services.async_call(
+        DOMAIN, SERVICE_START_PROFILE, {"duration": 5}, blocking=True
+    )
+    await toggle_light(fake_card, nexo)
+    assert not list(tmp_path.glob("nexo_profile_*.cprof"))
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=6))
+    await hass.async_block_till_done()
+
+    [path] = tmp_path.glob("nexo_profile_*.cprof")
+    assert "_handle_message" in profiled_functions(path)
+    assert nexo.profiler is None
+
+
+async def test_recording_services(
+    hass: HomeAssistant,
+    tmp_path: Path,
+    fake_card: FakeNexoCard,
+    config_entry: MockConfigEntry,
+    nexo: NexoBridge,
+) -> None:
+    """Test start_recording and stop_recording write a capture that replays."""
+    light = nexo.get_resource_by_id(LIGHT_ID)
+    entity_id = er.async_get(hass).async_get_entity_id(
+        LIGHT_DOMAIN, DOMAIN, str(LIGHT_ID)
+    )
+    await hass.services.async_call(DOMAIN, SERVICE_START_RECORDING, blocking=True)
+    await toggle_light(fake_card, nexo)
+    await hass.services.async_call(DOMAIN, SERVICE_STOP_RECORDING, blocking=True)
+    # Received after the recording stopped, so left out of the capture
+    await fake_card.send_update(LIGHT_ID, is_on=0)
+    await async_wait_until(lambda: light.state["is_on"] == 0)
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == STATE_OFF
+
+    path = tmp_path / f"nexo_frames_{config_entry.entry_id}.jsonl.gz"
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert len(records) == UPDATES
+    assert not read_frames(str(path), FRAME_OUTBOUND)
+
+    # The card replaying the capture brings the recorded states back
+    received = nexo.metrics.messages_received
+    await fake_card.replay(str(path))
+    await async_wait_until(lambda: nexo.metrics.messages_received == received + UPDATES)
+    await hass.async_block_till_done()
+
+    assert light.state["is_on"] == (UPDATES - 1) % 2
+    assert hass.states.get(entity_id).state == STATE_ON